@@ -0,0 +1,519 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from statistics import median
+from sys import argv
+
+SOLVER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wordle_solver.py')
+SERVICE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'wordle_service.py')
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmark_baseline.json')
+
+
+class StartupBenchmark:
+    def __init__(self, runs: int = 5, feedback: str = '02100'):
+        """
+        Measure how long the "assist" mode takes to print its first word, and its second word after one feedback.
+
+        Every run starts a new process in a scratch copy of the word data, without a compiled decision tree or a
+        guess cache, so it's timed from a cold start.
+
+        :param runs: Number of runs to take the median of.
+        :param feedback: Feedback to enter for the first word.
+        """
+
+        self._runs = runs
+        self._feedback = feedback
+
+    @staticmethod
+    def _prepare_data(directory: str) -> None:
+        """
+        Copy the word data to "directory", the pattern matrix is linked instead as it's only read.
+        """
+
+        os.mkdir(os.path.join(directory, 'data'))
+
+        for name in os.listdir(DATA_PATH):
+            source = os.path.join(DATA_PATH, name)
+            destination = os.path.join(directory, 'data', name)
+
+            if name.startswith(('decision_tree', 'guess_cache')):
+                continue
+            elif name.startswith('pattern_matrix'):
+                os.symlink(source, destination)
+            else:
+                shutil.copy(source, destination)
+
+    def _run_once(self, directory: str) -> tuple:
+        """
+        :return: Tuple of seconds until the first word, and until the second word.
+        """
+
+        for name in os.listdir(os.path.join(directory, 'data')):
+            if name.startswith('guess_cache'):
+                os.remove(os.path.join(directory, 'data', name))
+
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, SOLVER_PATH, 'assist'], cwd=directory, stdin=subprocess.PIPE,
+                                   stdout=subprocess.PIPE, universal_newlines=True)
+
+        try:
+            process.stdout.readline()
+            first_word = time.perf_counter() - start
+
+            process.stdin.write(self._feedback + '\n')
+            process.stdin.flush()
+            process.stdout.readline()  # Evaluation of the feedback.
+            process.stdout.readline()
+            second_word = time.perf_counter() - start
+        finally:
+            process.kill()
+            process.wait()
+
+        return first_word, second_word
+
+    def run(self) -> dict:
+        """
+        :return: Dictionary with the median seconds until the first and the second word.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            self._prepare_data(directory)
+            self._run_once(directory)  # Warm up the OS file cache.
+            results = [self._run_once(directory) for _ in range(self._runs)]
+
+        return {
+            'first_word': median(result[0] for result in results),
+            'second_word': median(result[1] for result in results),
+        }
+
+
+class SolverBenchmark:
+    STAGES = ('check_answer', 'check_answer_batch', 'filter', 'top_guesses', 'evaluate', 'simulate')
+    CALIBRATION = 'calibration'  # Stage always run first, the other stages are compared relative to it.
+    MEMORY_SLACK = 2 ** 20  # Peak memory growth always allowed, small stages barely allocate anything.
+
+    def __init__(self, repeat: int = 3, game_step: int = 8):
+        """
+        Measure the throughput and peak memory of the solver's hot paths, on the bundled word data.
+
+        Solvers are created without a decision tree and with an empty in-memory guess cache, so every stage does the
+        actual work. Throughput is the best of "repeat" runs, peak memory is traced in a separate run, as tracing
+        slows the stage down. A calibration stage of fixed work, not using the solver, is run as well, see "compare".
+
+        :param repeat: Number of timed runs of each stage.
+        :param game_step: Play every n-th answer in the "evaluate" and "simulate" stages.
+        """
+
+        import wordle_solver
+
+        self._wordle_solver = wordle_solver
+        self._repeat = repeat
+        self._game_step = game_step
+
+        solver = self._create_solver()
+        self._answers = solver.allowed_answers
+        self._guesses = solver.allowed_guesses
+
+    def _create_solver(self):
+        return self._wordle_solver.Solver(raw_allowed_guesses_path=os.path.join(DATA_PATH, '_allowed_guesses.txt'),
+                                          raw_allowed_answers_path=os.path.join(DATA_PATH, '_allowed_answers.txt'),
+                                          allowed_guesses_path=os.path.join(DATA_PATH, 'allowed_guesses.json'),
+                                          allowed_answers_path=os.path.join(DATA_PATH, 'allowed_answers.json'),
+                                          decision_tree_path=os.devnull, guess_cache_path='')
+
+    def _calibration(self):
+        """
+        :return: Function running the stage, it returns the amount of work done, and the unit of it.
+        """
+
+        import numpy as np
+
+        words = sorted(self._guesses)
+        values = np.random.default_rng(0).integers(0, 3 ** 5, size=(200, 2000), dtype=np.int64)
+
+        def run() -> int:
+            # String and dictionary work like "check_answer", then array work like the pattern matrix stages.
+            for word in words:
+                counts = {}
+
+                for char in word:
+                    counts[char] = counts.get(char, 0) + 1
+
+            np.sort(values, axis=1)
+            np.bincount(values.ravel(), minlength=3 ** 5)
+
+            return 1
+
+        return run, 'runs/s'
+
+    def _check_answer(self):
+        guesses = self._guesses[:100]
+        answers = self._answers[:200]
+        check_answer = self._wordle_solver.GameLogic.check_answer
+
+        def run() -> int:
+            for guess in guesses:
+                for answer in answers:
+                    check_answer(guess, answer)
+
+            return len(guesses) * len(answers)
+
+        return run, 'pairs/s'
+
+    def _check_answer_batch(self):
+        guesses = self._guesses[:200]
+        check_answer_batch = self._wordle_solver.GameLogic.check_answer_batch
+
+        def run() -> int:
+            check_answer_batch(guesses, self._answers)
+
+            return len(guesses) * len(self._answers)
+
+        return run, 'pairs/s'
+
+    def _filter(self):
+        solver = self._create_solver()
+        state = self._wordle_solver.CandidateState(solver.pattern_matrix, self._answers)
+        state.histograms  # Counted once, every filter starts from the same state.
+        words = self._answers[::10]
+        check_answer = self._wordle_solver.GameLogic.check_answer
+
+        def run() -> int:
+            # First turn feedback, the state with the most candidates to filter and histograms to update.
+            for word in words:
+                state.filter(word, check_answer(word, self._answers[0]))
+
+            return len(words)
+
+        return run, 'states/s'
+
+    def _top_guesses(self):
+        solver = self._create_solver()
+        pattern_matrix = solver.pattern_matrix
+        state = self._wordle_solver.CandidateState(pattern_matrix, self._answers, pattern_matrix.guesses)
+        # Candidates left by each pattern of the first guess, the largest ones are picked from the full guess pool.
+        bitsets = sorted({state.matches('raise', pattern_matrix.decode(code))
+                          for code in pattern_matrix.pattern_masks('raise').keys()},
+                         key=lambda bitset: bin(bitset).count('1'), reverse=True)[:20]
+
+        def run() -> int:
+            for bitset in bitsets:
+                state.subset(bitset).top_guesses(1)
+
+            return len(bitsets)
+
+        return run, 'states/s'
+
+    def _evaluate(self):
+        answers = self._answers[::self._game_step]
+        check_answer = self._wordle_solver.GameLogic.check_answer
+
+        def run() -> tuple:
+            # Each run needs a new solver, otherwise its guess cache would already hold every state.
+            solver = self._create_solver()
+            solver.verbose = False
+            seconds = 0.0
+            turns = 0
+
+            for answer in answers:
+                for _ in range(6):
+                    # Guesses are ranked when the next word is asked for, so a turn includes picking it.
+                    start = time.perf_counter()
+                    pattern = check_answer(solver.get_next_word(), answer)
+                    solver.evaluate(pattern)
+                    seconds += time.perf_counter() - start
+                    turns += 1
+
+                    if pattern == '2' * len(pattern):
+                        break
+
+                solver.reload()
+
+            return turns, seconds
+
+        return run, 'turns/s'
+
+    def _simulate(self):
+        wordle_solver = self._wordle_solver
+        answers = self._answers[::self._game_step]
+
+        def run() -> tuple:
+            solver = self._create_solver()
+            solver.verbose = False
+            wordle_game = wordle_solver.WordleGame(self._answers, self._guesses, wordle_solver.GameLogic.check_answer,
+                                                   input_injector=solver.get_next_word,
+                                                   output_receiver=solver.evaluate,
+                                                   output_game_result_to_receiver_enabled=False,
+                                                   result_pattern_pretty_print=False)
+            simulator = wordle_solver.Simulator(list(answers), solver, wordle_game)
+
+            start = time.perf_counter()
+            simulator.simulate()
+
+            return len(answers), time.perf_counter() - start
+
+        return run, 'games/s'
+
+    @staticmethod
+    def _measure(run) -> tuple:
+        """
+        :return: Tuple of the amount of work done, and the seconds it took.
+        """
+
+        start = time.perf_counter()
+        result = run()
+        seconds = time.perf_counter() - start
+
+        # Stages excluding their own setup from the timing return the seconds themselves.
+        return result if isinstance(result, tuple) else (result, seconds)
+
+    def run(self, stages: list = None) -> dict:
+        """
+        :param stages: (optional) Names of the stages to run, defaults to all of them.
+        :return: Dictionary with stage names as keys, dictionaries of throughput, unit and peak memory as values.
+        """
+
+        results = {}
+
+        stages = self.STAGES if (stages is None) else stages
+
+        for stage in [self.CALIBRATION] + [stage for stage in stages if stage != self.CALIBRATION]:
+            run, unit = getattr(self, f'_{stage}')()
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                throughput = 0.0
+
+                for _ in range(self._repeat):
+                    work, seconds = self._measure(run)
+                    throughput = max(throughput, work / seconds)
+
+                tracemalloc.start()
+                run()
+                peak_memory = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            results[stage] = {'throughput': throughput, 'unit': unit, 'peak_memory': peak_memory}
+
+        return results
+
+    @staticmethod
+    def compare(results: dict, baseline: dict, tolerance: float) -> list:
+        """
+        Find the stages that got slower, or used more memory, than their baseline by more than "tolerance".
+
+        Baseline throughputs are scaled by how much faster or slower the calibration stage ran than in the baseline,
+        so a baseline recorded on another machine, or under another load, still applies. Peak memory isn't scaled.
+
+        :param results: Result of "run".
+        :param baseline: Result of an earlier "run".
+        :param tolerance: Allowed regression as a fraction, i.e. 0.25 for 25%.
+        :return: List of regression descriptions, empty when there's none.
+        """
+
+        regressions = []
+        calibration = SolverBenchmark.CALIBRATION
+        scale = results[calibration]['throughput'] / baseline[calibration]['throughput'] \
+            if (calibration in results and calibration in baseline) else 1.0
+
+        for stage, result in results.items():
+            if stage not in baseline or stage == calibration:
+                continue
+
+            expected = baseline[stage]
+
+            if result['throughput'] < expected['throughput'] * scale * (1 - tolerance):
+                regressions.append(f'{stage}: {result["throughput"]:.1f} {result["unit"]}, '
+                                   f'baseline {expected["throughput"] * scale:.1f} {expected["unit"]} '
+                                   f'(scaled by calibration {scale:.2f})')
+
+            if result['peak_memory'] > max(expected['peak_memory'] * (1 + tolerance),
+                                           expected['peak_memory'] + SolverBenchmark.MEMORY_SLACK):
+                regressions.append(f'{stage}: peak memory {result["peak_memory"] / 2 ** 20:.1f} MiB, '
+                                   f'baseline {expected["peak_memory"] / 2 ** 20:.1f} MiB')
+
+        return regressions
+
+
+class ServiceBenchmark:
+    MAX_TURNS = 6
+
+    def __init__(self, sessions: int = 100, concurrency: int = 20, budget: float = None, seed: int = 0):
+        """
+        Measure the latency of each turn of concurrent assist sessions against a solver service, see
+        "wordle_service.py".
+
+        Every session plays a random answer over its own connection, and at most "concurrency" sessions are played at
+        once. A turn is the request returning a word, i.e. turn 1 is starting the session.
+
+        :param sessions: Number of sessions to play.
+        :param concurrency: Number of sessions played at once.
+        :param budget: (optional) Seconds each word may take, see "Solver.get_next_word".
+        :param seed: Seed picking the answers.
+        """
+
+        self._sessions = sessions
+        self._concurrency = concurrency
+        self._budget = budget
+        self._seed = seed
+
+    @staticmethod
+    def _percentile(values: list, fraction: float) -> float:
+        values = sorted(values)
+
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+    async def _play(self, host: str, port: int, answer: str, latencies: dict) -> None:
+        from wordle_solver import GameLogic
+
+        reader, writer = await asyncio.open_connection(host, port)
+        request = {'op': 'new'}
+
+        try:
+            for turn in range(1, self.MAX_TURNS + 1):
+                if self._budget is not None:
+                    request['budget'] = self._budget
+
+                start = time.perf_counter()
+                writer.write(json.dumps(request).encode('utf-8') + b'\n')
+                await writer.drain()
+                response = json.loads(await reader.readline())
+
+                if 'error' in response:
+                    raise RuntimeError(f'Service error: {response["error"]}')
+                elif response.get('solved'):
+                    return
+
+                latencies.setdefault(turn, []).append(time.perf_counter() - start)
+                request = {'op': 'feedback', 'session': response['session'],
+                           'pattern': GameLogic.check_answer(response['word'], answer)}
+
+            if request['pattern'] != '2' * len(answer):
+                request = {'op': 'close', 'session': request['session']}
+
+            writer.write(json.dumps(request).encode('utf-8') + b'\n')
+            await writer.drain()
+            await reader.readline()
+        finally:
+            writer.close()
+
+    async def measure(self, host: str, port: int) -> dict:
+        """
+        Play the sessions against a running service.
+
+        :param host: Address of the service.
+        :param port: Port of the service.
+        :return: Dictionary with turns as keys, dictionaries of their count, p50 and p99 seconds as values, and the
+            same for all turns under "all".
+        """
+
+        with open(os.path.join(DATA_PATH, 'allowed_answers.json'), 'r') as reader:
+            answers = random.Random(self._seed).choices(list(json.load(reader)), k=self._sessions)
+
+        latencies = {}
+        semaphore = asyncio.Semaphore(self._concurrency)
+
+        async def play(answer: str) -> None:
+            async with semaphore:
+                await self._play(host, port, answer, latencies)
+
+        await asyncio.gather(*(play(answer) for answer in answers))
+        latencies['all'] = [latency for turn in sorted(latencies) for latency in latencies[turn]]
+
+        return {turn: {'count': len(values), 'p50': self._percentile(values, 0.5),
+                       'p99': self._percentile(values, 0.99)} for turn, values in latencies.items()}
+
+    def run(self, workers: int = 1) -> dict:
+        """
+        Start a service on a free port, then play the sessions against it.
+
+        :param workers: Number of worker processes of the service.
+        :return: Result of "measure".
+        """
+
+        process = subprocess.Popen([sys.executable, SERVICE_PATH, '--port', '0', '--workers', str(workers)],
+                                   cwd=os.path.dirname(SERVICE_PATH), stdout=subprocess.PIPE,
+                                   universal_newlines=True)
+
+        try:
+            host, port = process.stdout.readline().split()[-1].rsplit(':', 1)  # "Serving on host:port"
+
+            return asyncio.run(self.measure(host, int(port)))
+        finally:
+            process.kill()
+            process.wait()
+
+
+def main():
+    # Solver module is only loaded when needed, like in "SolverBenchmark".
+    from wordle_solver import _get_option
+
+    if len(argv) > 1 and argv[1] == 'startup':
+        result = StartupBenchmark(runs=int(_get_option('--runs', '5'))).run()
+        budget = _get_option('--budget')
+
+        print(f'assist time to first word: {result["first_word"] * 1000:.0f} ms, '
+              f'to second word: {result["second_word"] * 1000:.0f} ms')
+
+        if budget is not None and result['first_word'] > float(budget):
+            print(f'Time to first word is over the budget of {float(budget) * 1000:.0f} ms.')
+            exit(1)
+    elif len(argv) > 1 and argv[1] == 'suite':
+        baseline_path = _get_option('--baseline', BASELINE_PATH)
+        stages = _get_option('--stages')
+        results = SolverBenchmark(repeat=int(_get_option('--repeat', '3'))).run(
+            None if (stages is None) else stages.split(','))
+
+        for stage, result in results.items():
+            print(f'{stage:<20} {result["throughput"]:>12.1f} {result["unit"]:<8} '
+                  f'peak memory {result["peak_memory"] / 2 ** 20:.1f} MiB')
+
+        if '--save-baseline' in argv:
+            with open(baseline_path, 'w') as writer:
+                json.dump(results, writer, indent=4)
+
+            print(f'Saved baseline to "{baseline_path}".')
+        elif os.path.exists(baseline_path):
+            with open(baseline_path, 'r') as reader:
+                regressions = SolverBenchmark.compare(results, json.load(reader),
+                                                      float(_get_option('--tolerance', '0.25')))
+
+            for regression in regressions:
+                print(f'Regression in {regression}')
+
+            if regressions:
+                exit(1)
+    elif len(argv) > 1 and argv[1] == 'service':
+        budget = _get_option('--budget')
+        service_benchmark = ServiceBenchmark(sessions=int(_get_option('--sessions', '100')),
+                                             concurrency=int(_get_option('--concurrency', '20')),
+                                             budget=None if (budget is None) else float(budget))
+
+        if _get_option('--port') is None:
+            results = service_benchmark.run(workers=int(_get_option('--workers', '1')))
+        else:
+            results = asyncio.run(service_benchmark.measure(_get_option('--host', '127.0.0.1'),
+                                                            int(_get_option('--port'))))
+
+        for turn, result in results.items():
+            print(f'turn {turn:<4} {result["count"]:>6} requests   p50 {result["p50"] * 1000:>8.1f} ms   '
+                  f'p99 {result["p99"] * 1000:>8.1f} ms')
+    else:
+        print('Usage: python3 ./benchmark.py startup [--runs N] [--budget SECONDS]\n'
+              '       python3 ./benchmark.py suite [--stages A,B] [--repeat N] [--baseline PATH] [--tolerance 0.25] '
+              '[--save-baseline]\n'
+              '       python3 ./benchmark.py service [--sessions N] [--concurrency N] [--budget SECONDS] '
+              '[--workers N | --host HOST --port PORT]')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,39 @@
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import os
+import subprocess
+import sys
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
-from wordle_solver import GameLogic
+import numpy as np
+
+from benchmark import ServiceBenchmark, StartupBenchmark
+from wordle_solver import CandidateState, Entropy, GameLogic, GuessCache, Instrumentation, Lexicon, \
+    LookaheadSearch, MultiBoardSolver, OpenerSweep, PatternMatrix, Simulator, Solver, WordleGame, \
+    WordStore
+from wordle_service import SessionStore, SolverService
+
+# Solver over the bundled word data, without a decision tree or a guess cache file.
+SOLVER_CONFIG = {
+    'raw_allowed_guesses_path': './data/_allowed_guesses.txt',
+    'raw_allowed_answers_path': './data/_allowed_answers.txt',
+    'allowed_guesses_path': './data/allowed_guesses.json',
+    'allowed_answers_path': './data/allowed_answers.json',
+    'decision_tree_path': os.devnull,
+    'guess_cache_path': '',
+}
+
+# Few answers, with every kind of pattern between them.
+WORDS = ['seize', 'slide', 'shoot', 'socko', 'dodge', 'soddy', 'hodad', 'beret', 'trend']
+
+
+def small_pattern_matrix(extra_guesses: list = ()) -> PatternMatrix:
+    # "WORDS" are the answers, and are allowed guesses along with "extra_guesses".
+    return PatternMatrix(WORDS + list(extra_guesses), WORDS)
 
 
 class TestGameLogic(TestCase):
@@ -10,3 +43,574 @@ class TestGameLogic(TestCase):
         self.assertEqual('12200', GameLogic.check_answer('dodge', 'soddy'))
         self.assertEqual('02201', GameLogic.check_answer('hodad', 'soddy'))
         self.assertEqual('01101', GameLogic.check_answer('beret', 'trend'))
+
+    def test_check_answer_batch(self):
+        words_to_check = ['seize', 'shoot', 'dodge', 'hodad', 'beret']
+        words_to_compare = ['slide', 'socko', 'soddy', 'trend', 'eerie']
+
+        codes = GameLogic.check_answer_batch(words_to_check, words_to_compare)
+
+        for i, word_to_check in enumerate(words_to_check):
+            self.assertEqual([GameLogic.check_answer(word_to_check, word) for word in words_to_compare],
+                             [PatternMatrix.decode(code) for code in codes[i].tolist()])
+
+        self.assertEqual(codes[4].tolist(), GameLogic.check_answer_batch('beret', words_to_compare).tolist())
+
+
+class TestEntropy(TestCase):
+    def test_entropy_math(self):
+        histograms = np.array([[1, 1, 2, 0], [4, 0, 0, 0]])
+
+        self.assertAlmostEqual(Entropy.entropy_math({0: 0.25, 1: 0.25, 2: 0.5}, 2),
+                               Entropy.entropy_math(histograms, 2)[0])
+        self.assertEqual(0, Entropy.entropy_math(histograms, 2)[1])
+        self.assertEqual([[0, 2, 1], [3, 0, 0]],
+                         Entropy.pattern_histograms(np.array([[1, 1, 2], [0, 0, 0]]), 3).tolist())
+
+        codes = np.array([[1, 1, 2, 0], [0, 0, 0, 0]], dtype=np.uint8)
+        self.assertTrue(np.allclose(Entropy.entropy_math(Entropy.pattern_histograms(codes, 3), 2),
+                                    Entropy.code_entropies(codes, 2)))
+
+
+class TestWordStore(TestCase):
+    def test_save(self):
+        data = {'seize': [4.21, 3.15], 'slide': [5.3, 4.02], 'shoot': [0.0, 3.9]}
+
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'words.bin')
+            WordStore(path).save(data)
+
+            # Read back from the memory-mapped file, in the stored order.
+            word_store = WordStore(path)
+            self.assertEqual(3, len(word_store))
+            self.assertEqual(['seize', 'slide', 'shoot'], word_store.words)
+            self.assertEqual(data, word_store.to_dict())
+            output = io.StringIO()
+            word_store.export_json(output)
+            self.assertEqual(data, json.loads(output.getvalue()))
+            word_store.close()
+
+            with open(path, 'rb') as reader:
+                content = reader.read()
+
+            # Cut off, or not a word store, files can't be read, so they're rebuilt instead.
+            for corrupt in (content[:10], content[:-4], b'JUNK' + content[4:]):
+                with open(path, 'wb') as writer:
+                    writer.write(corrupt)
+
+                with self.assertRaises(ValueError):
+                    len(WordStore(path))
+
+            with self.assertRaises(ValueError):
+                WordStore(path).save({'seize': [0.0, 0.0], 'jump': [0.0, 0.0]})
+
+
+class TestPatternMatrix(TestCase):
+    def test_pattern(self):
+        pattern_matrix = small_pattern_matrix()
+
+        for guess in WORDS:
+            for answer in WORDS:
+                self.assertEqual(GameLogic.check_answer(guess, answer),
+                                 PatternMatrix.decode(pattern_matrix.pattern(guess, answer)))
+
+        # Words missing from the matrix fall back to "GameLogic.check_answer".
+        self.assertEqual('20202', PatternMatrix.decode(pattern_matrix.pattern('seize', 'slice')))
+        self.assertEqual([PatternMatrix.encode('01101'), PatternMatrix.encode('22222')],
+                         pattern_matrix.patterns('beret', ['trend', 'beret']).tolist())
+
+    def test_pattern_masks(self):
+        pattern_matrix = small_pattern_matrix()
+        pattern_matrix.PATTERN_MASKS_CAPACITY = 2
+
+        for guess in WORDS:
+            for code, mask in pattern_matrix.pattern_masks(guess).items():
+                self.assertEqual(sorted(answer for answer in WORDS if pattern_matrix.pattern(guess, answer) == code),
+                                 [pattern_matrix.answers[column] for column in pattern_matrix.from_bitset(mask)])
+                self.assertEqual(mask, pattern_matrix.pattern_mask(guess, code))
+
+        # Only the masks of the most recently used words are kept, single masks of the others are read from the matrix.
+        self.assertEqual(['beret', 'trend'], list(pattern_matrix._pattern_masks))
+        self.assertEqual(pattern_matrix.to_bitset(pattern_matrix.answer_indices(['seize'])),
+                         pattern_matrix.pattern_mask('seize', PatternMatrix.encode('22222')))
+        self.assertEqual(['beret', 'trend'], list(pattern_matrix._pattern_masks))
+
+
+class TestLexicon(TestCase):
+    def test_consistent_words(self):
+        words = WORDS + ['eerie', 'geese']
+        lexicon = Lexicon(words)
+        self.assertIn('trend', lexicon)
+        self.assertNotIn('jumpy', lexicon)
+
+        # Every pattern of a few guesses, including impossible ones, selects the words producing it.
+        for guess in ('eerie', 'dodge', 'socko'):
+            for code in range(3 ** 5):
+                pattern = PatternMatrix.decode(code)
+                self.assertEqual([word for word in words if GameLogic.check_answer(guess, word) == pattern],
+                                 lexicon.consistent_words([(guess, pattern)]))
+
+        feedback = [('shoot', '20000'), ('seize', '20202')]
+        self.assertEqual(['slide'], lexicon.consistent_words(feedback))
+        # Hard mode only asks for the green letters to stay in place.
+        self.assertEqual(['seize', 'slide'], lexicon.consistent_words(feedback, hints_only=True))
+        self.assertEqual(['eerie', 'geese'], lexicon.consistent_words([('eerie', '12002')], hints_only=True))
+
+    def test_hard_mode(self):
+        guesses = iter(['shoot', 'trend', 'socko', 'soddy'])
+        outputs = []
+        wordle_game = WordleGame(WORDS, WORDS, GameLogic.check_answer, input_injector=lambda: next(guesses),
+                                 output_receiver=outputs.append, designated_answer='soddy',
+                                 output_game_result_to_receiver_enabled=False, result_pattern_pretty_print=False,
+                                 hard_mode=True)
+
+        # 'trend' drops the green 's', so the next guess is asked for instead.
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.assertEqual(3, wordle_game.play())
+        self.assertEqual(['shoot', 'socko', 'soddy'], wordle_game.guessed_answers)
+
+
+class TestCandidateState(TestCase):
+    def test_filter(self):
+        pattern_matrix = small_pattern_matrix()
+        state = CandidateState(pattern_matrix, WORDS)
+
+        # Most candidates survive, histograms are updated by subtracting the eliminated ones.
+        state = state.filter('jumpy', '00000')
+        self.assertEqual(['beret', 'dodge', 'hodad', 'seize', 'shoot', 'slide', 'socko', 'trend'], state.candidates)
+        self.assertEqual(CandidateState(pattern_matrix, state.candidates).histograms.tolist(),
+                         state.histograms.tolist())
+
+        # Few candidates survive, histograms are recounted.
+        state = state.filter('seize', '20000')
+        self.assertEqual(['shoot', 'socko'], state.candidates)
+        self.assertEqual(pattern_matrix.to_bitset(pattern_matrix.answer_indices(['shoot', 'socko'])), state.bitset)
+        self.assertEqual([1, 1], sorted(state.split_sizes('shoot').values()))
+        self.assertEqual(CandidateState(pattern_matrix, state.candidates).histograms.tolist(),
+                         state.histograms.tolist())
+
+    def test_filter_guess_pool(self):
+        pattern_matrix = small_pattern_matrix(['jumpy', 'vivid'])
+        state = CandidateState(pattern_matrix, WORDS, pattern_matrix.guesses)
+
+        # 'beret' can't split the survivors anymore.
+        state = state.filter('beret', '00000')
+        self.assertEqual(['hodad', 'socko', 'soddy'], state.candidates)
+        self.assertEqual(['dodge', 'hodad', 'jumpy', 'seize', 'shoot', 'slide', 'socko', 'soddy', 'trend', 'vivid'],
+                         state.guesses)
+        self.assertEqual(('hodad', 1.58), state.best_guess())
+
+        # Only the answer is left, it's the only guess worth keeping.
+        state = state.filter('vivid', '00000')
+        self.assertEqual(['socko'], state.guesses)
+        self.assertEqual(('socko', 0.0), state.best_guess())
+
+    def test_top_guesses(self):
+        pattern_matrix = small_pattern_matrix(['jumpy', 'vivid', 'doest', 'heeds', 'tease'])
+        state = CandidateState(pattern_matrix, WORDS, pattern_matrix.guesses)
+
+        for guess, pattern in [('jumpy', '00000'), ('seize', '10000'), ('vivid', '00002')]:
+            for k in (1, 3, len(pattern_matrix.guesses)):
+                # Pruned blocks never change the result of ranking every guess.
+                lazy = state.subset(state.bitset, state.guess_rows)
+                self.assertTrue(np.all(lazy.upper_bounds() >= lazy.entropies() - 1e-9))
+                self.assertEqual(state.top_guesses(k, state.entropies()), lazy.top_guesses(k, block_size=2))
+
+            state = state.filter(guess, pattern)
+
+    def test_anytime_guess(self):
+        pattern_matrix = small_pattern_matrix(['jumpy', 'vivid', 'doest', 'heeds', 'tease'])
+        state = CandidateState(pattern_matrix, WORDS, pattern_matrix.guesses)
+
+        # With enough time the best guess is found, and proven to be the best one.
+        self.assertEqual(state.top_guesses(1)[0] + (True,),
+                         state.anytime_guess(float('inf'), sample_size=2, block_size=2))
+
+        # Out of time, the guess is only ranked by its entropy over the sample.
+        guess, entropy, exact = state.anytime_guess(float('-inf'), sample_size=2)
+        self.assertIn(guess, pattern_matrix.guesses)
+        self.assertLessEqual(entropy, 1.0)
+        self.assertFalse(exact)
+
+
+class TestLookaheadSearch(TestCase):
+    def test_best_guess(self):
+        pattern_matrix = small_pattern_matrix()
+
+        def expected_guesses(candidates: list) -> float:
+            if len(candidates) == 1:
+                return 1.0
+
+            best = float('inf')
+
+            for guess in candidates:
+                groups = {}
+                for answer in candidates:
+                    groups.setdefault(GameLogic.check_answer(guess, answer), []).append(answer)
+
+                best = min(best, 1 + sum(len(group) * expected_guesses(group)
+                                         for pattern, group in groups.items() if pattern != '22222') / len(candidates))
+
+            return best
+
+        # Deep and wide enough to try every guess of every game, so the search has to find the optimum.
+        search = LookaheadSearch(depth=len(WORDS), breadth=len(WORDS))
+        guess, expected = search.best_guess(CandidateState(pattern_matrix, WORDS))
+        self.assertIn(guess, WORDS)
+        self.assertAlmostEqual(expected_guesses(WORDS), expected)
+
+        # Searched candidate sets are looked up from then on.
+        nodes = search.nodes
+        self.assertEqual((guess, expected), search.best_guess(CandidateState(pattern_matrix, WORDS)))
+        self.assertEqual(nodes, search.nodes)
+
+    def test_solver_settings(self):
+        solver = Solver(**SOLVER_CONFIG, strategy='lookahead', lookahead_depth=1, lookahead_breadth=4)
+        self.assertEqual((1, 4), (solver.lookahead.depth, solver.lookahead.breadth))
+        self.assertEqual(1, Solver(**solver.config).lookahead.depth)
+
+        # Trees and cached guesses of one search aren't used by another.
+        other = Solver(**dict(solver.config, lookahead_depth=2))
+        self.assertNotEqual(solver._guess_cache_namespace, other._guess_cache_namespace)
+        self.assertEqual(Solver(**SOLVER_CONFIG)._guess_cache_namespace,
+                         Solver(**SOLVER_CONFIG, lookahead_depth=3)._guess_cache_namespace)
+
+        with self.assertRaises(AttributeError):
+            solver.lookahead.depth = 3
+
+    def test_time_budget(self):
+        def play(solver: Solver, answer: str, time_budget: float = None) -> list:
+            solver.reload()
+            words = []
+
+            while not words or words[-1] != answer:
+                words.append(solver.get_next_word(time_budget))
+                solver.evaluate(GameLogic.check_answer(words[-1], answer))
+
+            return words
+
+        expected = Solver(**SOLVER_CONFIG, strategy='lookahead', lookahead_breadth=4)
+        expected.verbose = False
+        solver = Solver(**expected.config)
+        solver.verbose = False
+
+        for answer in ('taunt', 'pilot', 'mound'):
+            # Out of time, the entropy pick is only approximate, and isn't cached for later games to play.
+            solver.reload()
+            solver.evaluate(GameLogic.check_answer(solver.get_next_word(float('-inf')), answer))
+            solver.get_next_word(float('-inf'))
+            self.assertFalse(solver.last_word_exact)
+
+            self.assertEqual(play(expected, answer), play(solver, answer, 60.0))
+            self.assertEqual(play(expected, answer), play(solver, answer))
+
+
+class TestMultiBoardSolver(TestCase):
+    def test_play(self):
+        pattern_matrix = small_pattern_matrix()
+        state = CandidateState(pattern_matrix, WORDS)
+        solver = MultiBoardSolver(pattern_matrix, WORDS, boards=2)
+
+        # Boards with the same candidates are scored once, their entropies add up.
+        self.assertTrue(np.allclose(2 * state.entropies(), solver.scores(state.guess_rows)))
+
+        for answers in itertools.permutations(WORDS, 2):
+            self.assertGreater(Simulator._play_boards(solver, list(answers)), 0)
+            self.assertEqual([False, False], solver.solved)
+
+        with self.assertRaises(ValueError):
+            solver.evaluate(['00000'])
+
+
+class TestGuessCache(TestCase):
+    def test_get_put(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'guess_cache.sqlite')
+            key = GuessCache.fingerprint('test', 0b1011)
+            self.assertNotEqual(key, GuessCache.fingerprint('other', 0b1011))
+
+            cache = GuessCache(capacity=1, path=path)
+            self.assertIsNone(cache.get(key))
+            cache.put(key, {'guesses': {'shoot': [1.0, 3.2]}})
+            cache.put(GuessCache.fingerprint('test', 0b11), {})
+            self.assertEqual({'guesses': {'shoot': [1.0, 3.2]}}, cache.get(key))
+            cache.close()
+
+            # Entries are kept in the file across sessions.
+            cache = GuessCache(path=path)
+            self.assertEqual({'guesses': {'shoot': [1.0, 3.2]}}, cache.get(key))
+            self.assertEqual({'hits': 1, 'misses': 0, 'size': 1}, cache.stats)
+            cache.close()
+
+    def test_capacity(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'guess_cache.sqlite')
+            value = {'guesses': {'shoot': [1.0, 3.2]}}  # 31 bytes of JSON.
+            cache = GuessCache(capacity=100, path=path, disk_capacity=1000)
+
+            # Both tiers keep the most recently used entries fitting in their bytes.
+            for bitset in range(256):
+                cache.put(GuessCache.fingerprint('test', bitset), value)
+
+            self.assertEqual(3, cache.stats['size'])
+            cache.close()
+
+            cache = GuessCache(capacity=0, path=path)
+            self.assertEqual(value, cache.get(GuessCache.fingerprint('test', 255)))
+            self.assertEqual(value, cache.get(GuessCache.fingerprint('test', 224)))
+            self.assertIsNone(cache.get(GuessCache.fingerprint('test', 223)))
+            cache.close()
+
+
+class TestInstrumentation(TestCase):
+    def test_merge(self):
+        instrumentation = Instrumentation()
+        with instrumentation.phase('filter'):
+            pass
+        instrumentation.record_turn(1, 60)
+
+        worker = Instrumentation()
+        with worker.phase('filter'):
+            pass
+        worker.record_turn(1, 20)
+        worker.record_turn(2, 3)
+
+        instrumentation.merge(worker.to_dict())
+        aggregates = instrumentation.to_dict()
+        self.assertEqual(2, aggregates['phases']['filter']['calls'])
+        self.assertEqual({'count': 2, 'total_candidates': 80, 'mean_candidates': 40.0, 'min_candidates': 20,
+                          'max_candidates': 60}, aggregates['turns']['1'])
+        self.assertEqual(3, aggregates['turns']['2']['max_candidates'])
+
+        disabled = Instrumentation(enabled=False)
+        with disabled.phase('filter'):
+            pass
+        disabled.record_turn(1, 60)
+        self.assertEqual({'phases': {}, 'turns': {}}, disabled.to_dict())
+
+
+class TestSolver(TestCase):
+    def test_snapshot(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+
+        def play(answer: str) -> list:
+            words = []
+
+            while not words or words[-1] != answer:
+                words.append(solver.get_next_word())
+                solver.evaluate(GameLogic.check_answer(words[-1], answer))
+
+            return words
+
+        solver.evaluate(GameLogic.check_answer(solver.get_next_word(), 'taunt'))
+        fork = solver.snapshot()
+        candidates = len(fork.candidate_state)
+        taunt = play('taunt')
+
+        # Another branch of the same game, from the fork.
+        solver.restore(fork)
+        other = next(candidate for candidate in fork.candidate_state.candidates if candidate != 'taunt')
+        self.assertEqual(other, play(other)[-1])
+
+        # Neither branch changed the fork, the first one plays out the same again.
+        solver.restore(fork)
+        self.assertEqual(candidates, len(fork.candidate_state))
+        self.assertEqual(1, len(fork.used_words))
+        self.assertEqual(taunt, play('taunt'))
+
+
+class TestSimulator(TestCase):
+    def test_lost_game(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+        wordle_game = WordleGame(solver.allowed_answers, solver.allowed_guesses, GameLogic.check_answer, round_limit=1,
+                                 input_injector=solver.get_next_word, output_receiver=solver.evaluate,
+                                 output_game_result_to_receiver_enabled=False, result_pattern_pretty_print=False,
+                                 lexicon=solver.lexicon)
+        # Answers are played from the last one, so the first game is lost and there's no average yet.
+        simulator = Simulator(['raise', 'tatty'], solver, wordle_game)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            simulator.simulate()
+
+        self.assertEqual(1, simulator.game_record[-1])
+        self.assertEqual(1, simulator.game_record[1])
+        self.assertEqual(1.0, simulator.game_record['Average'])
+
+    def test_simulate_stream(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+        answers = solver.allowed_answers[::200]
+
+        def simulator(round_limit: int = 6) -> Simulator:
+            wordle_game = WordleGame(solver.allowed_answers, solver.allowed_guesses, GameLogic.check_answer,
+                                     round_limit=round_limit, input_injector=solver.get_next_word,
+                                     output_receiver=solver.evaluate, output_game_result_to_receiver_enabled=False,
+                                     result_pattern_pretty_print=False, lexicon=solver.lexicon)
+
+            return Simulator(list(answers), solver, wordle_game)
+
+        with TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            path = os.path.join(directory, 'simulation.jsonl')
+            uninterrupted = simulator()
+            uninterrupted.simulate()
+
+            # Run cut off after a few games, in the middle of writing a record.
+            simulator().simulate_stream(path)
+            with open(path, 'rb') as reader:
+                lines = reader.readlines()
+            with open(path, 'wb') as writer:
+                writer.writelines(lines[:4])
+                writer.write(lines[4][:10])
+
+            resumed = simulator()
+            resumed.simulate_stream(path)
+            self.assertEqual(uninterrupted.game_record, resumed.game_record)
+
+            with open(path, 'rb') as reader:
+                records = [json.loads(line) for line in reader]
+            self.assertEqual(sorted(answers), sorted(record['answer'] for record in records[1:]))
+
+            # Games of other settings aren't counted with them.
+            with self.assertRaises(ValueError):
+                simulator(round_limit=5).simulate_stream(path)
+
+    def test_workers(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+        results = []
+
+        with TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            for workers in (1, 2):
+                wordle_game = WordleGame(solver.allowed_answers, solver.allowed_guesses, GameLogic.check_answer,
+                                         input_injector=solver.get_next_word, output_receiver=solver.evaluate,
+                                         output_game_result_to_receiver_enabled=False,
+                                         result_pattern_pretty_print=False, lexicon=solver.lexicon)
+                simulator = Simulator(solver.allowed_answers[::100], solver, wordle_game)
+                simulator.simulate(workers=workers)
+
+                path = os.path.join(directory, f'simulation_{workers}.json')
+                simulator.dump_result(path)
+                with open(path, 'r') as reader:
+                    results.append(reader.read())
+
+        self.assertEqual(results[0], results[1])
+
+    def test_score_decision_tree(self):
+        with TemporaryDirectory() as directory:
+            solver = Solver(**dict(SOLVER_CONFIG, decision_tree_path=os.path.join(directory, 'decision_tree.json')))
+            solver.verbose = False
+            solver.compile_decision_tree(round_limit=3)
+            answers = solver.allowed_answers[::10]
+
+            def simulator(round_limit: int) -> Simulator:
+                wordle_game = WordleGame(solver.allowed_answers, solver.allowed_guesses, GameLogic.check_answer,
+                                         round_limit=round_limit, input_injector=solver.get_next_word,
+                                         output_receiver=solver.evaluate, output_game_result_to_receiver_enabled=False,
+                                         result_pattern_pretty_print=False, lexicon=solver.lexicon)
+
+                return Simulator(list(answers), solver, wordle_game)
+
+            # Walking the tree records the same games as playing them.
+            played = simulator(3)
+            with contextlib.redirect_stdout(io.StringIO()):
+                played.simulate()
+            scored = simulator(3)
+            scored.score_decision_tree()
+            self.assertEqual(played.game_record, scored.game_record)
+
+            # Games of more rounds than compiled leave the tree.
+            with self.assertRaises(ValueError):
+                simulator(4).score_decision_tree()
+
+            # Without an opening word, the tree has to open with the solver's own first guess.
+            solver.opening_word = 'crane'
+            solver.compile_decision_tree(round_limit=3)
+            solver.opening_word = ''
+            with self.assertRaises(ValueError):
+                simulator(3).score_decision_tree()
+
+
+class TestOpenerSweep(TestCase):
+    def test_sweep(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+        wordle_game = WordleGame(solver.allowed_answers, solver.allowed_guesses, GameLogic.check_answer,
+                                 input_injector=solver.get_next_word, output_receiver=solver.evaluate,
+                                 output_game_result_to_receiver_enabled=False, result_pattern_pretty_print=False,
+                                 lexicon=solver.lexicon)
+
+        with TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            def sweep(openers: list) -> list:
+                return OpenerSweep(solver, wordle_game, solver.allowed_answers[::100], directory).sweep(openers)
+
+            # Invalid and repeated openers are skipped.
+            crane = sweep(['crane', 'qqqqq', 'crane'])
+            self.assertEqual(['crane'], [result['opener'] for result in crane])
+
+            # Swept openers are kept from the results, not played again.
+            ranked = sweep(['slate', 'crane', 'raise'])
+            self.assertIn(crane[0], [dict(result, rank=1) for result in ranked])
+            self.assertEqual([1, 2, 3], [result['rank'] for result in ranked])
+            self.assertEqual(sorted(ranked, key=lambda result: (result['average'], result['failures'])), ranked)
+
+            with open(os.path.join(directory, 'sweep.jsonl'), 'r') as reader:
+                header, *lines = reader.readlines()
+            self.assertEqual(['crane', 'slate', 'raise'], [json.loads(line)['opener'] for line in lines])
+            with open(os.path.join(directory, 'leaderboard.json'), 'r') as reader:
+                self.assertEqual(ranked, json.load(reader))
+
+
+class TestStartup(TestCase):
+    ASSIST_COLD_START_BUDGET = 1.5  # Seconds until "assist" prints its first word.
+
+    def test_lazy_imports(self):
+        modules = subprocess.check_output([sys.executable, '-c',
+                                           'import sys, wordle_solver; print(sorted(sys.modules))'],
+                                          universal_newlines=True)
+
+        for module in ('matplotlib', 'multiprocessing', 'wordfreq'):
+            self.assertNotIn(f"'{module}'", modules)
+
+    def test_assist_cold_start(self):
+        self.assertLess(StartupBenchmark(runs=3).run()['first_word'], self.ASSIST_COLD_START_BUDGET)
+
+
+class TestSolverService(TestCase):
+    def test_sessions(self):
+        async def play() -> tuple:
+            service = SolverService(SOLVER_CONFIG, workers=0)
+            await service.start(port=0)
+
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+                errors = []
+
+                for request in (b'{"op": "feedback", "session": 0, "pattern": "00000"}', b'{"op": "new", "opener": 5}'):
+                    writer.write(request + b'\n')
+                    errors.append(json.loads(await reader.readline()))
+
+                writer.close()
+
+                return errors, await ServiceBenchmark(sessions=6, concurrency=3).measure('127.0.0.1', service.port)
+            finally:
+                await service.close()
+
+        errors, results = asyncio.run(play())
+        self.assertEqual([{'error': 'Unknown session 0.'}, {'error': 'Opener must be an allowed guess.'}], errors)
+        # Every session got its first word, and later turns only come from the same sessions.
+        self.assertEqual(6, results[1]['count'])
+        self.assertEqual(sum(result['count'] for turn, result in results.items() if turn != 'all'),
+                         results['all']['count'])
+        self.assertLessEqual(results['all']['p50'], results['all']['p99'])
+
+    def test_compact_sessions(self):
+        solver = Solver(**SOLVER_CONFIG)
+        solver.verbose = False
+        session_store = SessionStore(solver)
+
+        self.assertEqual('crane', session_store.handle({'op': 'new', 'session': 0, 'opener': 'crane'})['word'])
+        self.assertIn('word', session_store.handle({'op': 'feedback', 'session': 0, 'pattern': '00100'}))
+        # Sessions keep their candidates, not the histograms counted over them.
+        self.assertIsNone(session_store._sessions[0].candidate_state._histograms)
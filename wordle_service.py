@@ -0,0 +1,272 @@
+import asyncio
+import json
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from sys import argv
+
+from wordle_solver import Solver, _get_option
+
+
+class SessionStore:
+    def __init__(self, solver: Solver, capacity: int = 10000):
+        """
+        Independent assist sessions sharing one solver, each session only keeps a snapshot of its game.
+
+        Snapshots share the word data, and any state the session didn't change, with the solver. Their candidate
+        states are kept without histograms, so a session only holds its remaining candidates, and histograms are
+        recounted over them when the session continues. See "Solver.snapshot".
+
+        :param solver: Solver to play the sessions with, it's restored to a session's snapshot for each request.
+        :param capacity: (optional) Maximum number of sessions to keep, the least recently used ones are dropped first.
+        """
+
+        self._solver = solver
+        self._capacity = capacity
+        self._sessions = OrderedDict()
+
+        # Shared by every session until its first feedback, so it keeps its histograms.
+        solver.reload()
+        self._initial_state = solver.snapshot().candidate_state
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def handle(self, request: dict) -> dict:
+        """
+        Handle a request of the service protocol, see "SolverService".
+
+        :param request: Request, with its "op" and the session id it's for.
+        :return: Response to send back.
+        """
+
+        op = request.get('op')
+        budget = request.get('budget')
+
+        if budget is not None and not isinstance(budget, (int, float)):
+            return {'error': 'Budget must be a number of seconds.'}
+
+        if op == 'new':
+            return self._new(request['session'], request.get('opener', ''), budget)
+        elif op == 'feedback':
+            return self._feedback(request['session'], request.get('pattern'), budget)
+        elif op == 'close':
+            self._sessions.pop(request['session'], None)
+
+            return {'session': request['session'], 'closed': True}
+
+        return {'error': f'Unknown op "{op}".'}
+
+    def _suggest(self, session: int, budget: float) -> dict:
+        """
+        Pick the next word of the session the solver is playing, and keep the session's new snapshot.
+        """
+
+        word = self._solver.get_next_word(budget)
+        snapshot = self._solver.snapshot()
+        state = snapshot.candidate_state
+
+        if state is not self._initial_state:
+            snapshot = snapshot._replace(candidate_state=state.subset(state.bitset, state.guess_rows))
+
+        self._sessions[session] = snapshot
+        self._sessions.move_to_end(session)
+
+        while len(self._sessions) > self._capacity:
+            self._sessions.popitem(last=False)
+
+        return {'session': session, 'word': word, 'exact': self._solver.last_word_exact}
+
+    def _new(self, session: int, opener: str, budget: float) -> dict:
+        if not isinstance(opener, str) or (opener != '' and opener not in self._solver.lexicon):
+            return {'error': 'Opener must be an allowed guess.'}
+
+        self._solver.reload()
+        self._solver.opening_word = opener
+
+        return self._suggest(session, budget)
+
+    def _feedback(self, session: int, pattern: str, budget: float) -> dict:
+        if session not in self._sessions:
+            return {'error': f'Unknown session {session}.'}
+
+        snapshot = self._sessions[session]
+
+        if not isinstance(pattern, str) or len(pattern) != len(snapshot.last_used_word) or set(pattern) - set('012'):
+            return {'error': f'Pattern must be {len(snapshot.last_used_word)} digits of 0, 1 or 2.'}
+
+        self._solver.restore(snapshot)
+        self._solver.evaluate(pattern)
+
+        if pattern == '2' * len(pattern):
+            del self._sessions[session]
+
+            return {'session': session, 'solved': True}
+
+        if len(self._solver.snapshot().candidate_state) == 0:
+            # Session is kept as it was, so the feedback can be corrected.
+            return {'error': 'No word matches the feedback.'}
+
+        return self._suggest(session, budget)
+
+
+class SolverService:
+    _worker: SessionStore = None  # Sessions of the current worker process.
+
+    def __init__(self, solver_config: dict, workers: int = 1, session_capacity: int = 10000):
+        """
+        Serve assist sessions over TCP, each request and response is a line of JSON.
+
+        Requests:
+        - {"op": "new"}, optionally with an "opener": Start a session, responds with its "session" id and first "word".
+        - {"op": "feedback", "session": id, "pattern": "02100"}: Apply the feedback of the last word, responds with
+          the next "word", or "solved" when the pattern is all 2s.
+        - {"op": "close", "session": id}: Drop an unfinished session.
+
+        "new" and "feedback" take an optional "budget" in seconds, see "Solver.get_next_word", and their responses
+        tell whether the word is "exact". Failed requests get an "error" response.
+
+        Sessions are spread across worker processes, each with its own solver over the same memory-mapped word data,
+        and every request of a session goes to the same worker.
+
+        :param solver_config: Keyword arguments to create the solvers with.
+        :param workers: (optional) Number of worker processes, 0 to handle requests in the serving process.
+        :param session_capacity: (optional) Maximum number of sessions each worker keeps.
+        """
+
+        self._solver_config = solver_config
+        self._workers = workers
+        self._session_capacity = session_capacity
+        self._executors = []
+        self._next_session = 0
+        self._server = None
+        self._connections = {}  # Writer of each open connection, with the task handling it.
+
+    @staticmethod
+    def _init_worker(solver_config: dict, session_capacity: int) -> None:
+        solver = Solver(**solver_config)
+        solver.verbose = False
+        SolverService._worker = SessionStore(solver, session_capacity)
+
+    @staticmethod
+    def _handle(request: dict) -> dict:
+        return SolverService._worker.handle(request)
+
+    @staticmethod
+    def _ready() -> bool:
+        return True
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def _dispatch(self, request: dict) -> dict:
+        if request.get('op') == 'new':
+            request = dict(request, session=self._next_session)
+            self._next_session += 1
+
+        if not isinstance(request.get('session'), int):
+            return {'error': 'Session must be the id given by "new".'}
+
+        if not self._executors:
+            return self._handle(request)
+
+        executor = self._executors[request['session'] % len(self._executors)]
+
+        return await asyncio.get_running_loop().run_in_executor(executor, SolverService._handle, request)
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._connections[writer] = asyncio.current_task()
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                try:
+                    request = json.loads(line)
+                    response = await self._dispatch(request) if isinstance(request, dict) else \
+                        {'error': 'Request must be a JSON object.'}
+                except ValueError as error:
+                    response = {'error': f'Invalid request: {error}'}
+
+                writer.write(json.dumps(response).encode('utf-8') + b'\n')
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            del self._connections[writer]
+            writer.close()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """
+        Start the workers, then start listening.
+
+        :param host: (optional) Address to listen on.
+        :param port: (optional) Port to listen on, 0 to pick a free one, see "port".
+        """
+
+        if self._workers > 0:
+            loop = asyncio.get_running_loop()
+            self._executors = [ProcessPoolExecutor(1, initializer=SolverService._init_worker,
+                                                   initargs=(self._solver_config, self._session_capacity))
+                               for _ in range(self._workers)]
+            # Workers load their solver before the first session, not during it.
+            await asyncio.gather(*(loop.run_in_executor(executor, SolverService._ready)
+                                   for executor in self._executors))
+        else:
+            self._init_worker(self._solver_config, self._session_capacity)
+
+        self._server = await asyncio.start_server(self._serve_connection, host, port)
+
+    async def close(self) -> None:
+        self._server.close()
+
+        # Open connections read to their end, so their handlers finish instead of being cancelled.
+        for writer in self._connections:
+            writer.close()
+
+        if self._connections:
+            await asyncio.wait(list(self._connections.values()))
+
+        await self._server.wait_closed()
+
+        for executor in self._executors:
+            executor.shutdown()
+
+        self._executors = []
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8765) -> None:
+        """
+        Start the service, then serve until cancelled.
+        """
+
+        await self.start(host, port)
+        print(f'Serving on {host}:{self.port}', flush=True)
+
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+
+def main():
+    solver_config = {
+        'raw_allowed_guesses_path': './data/_allowed_guesses.txt',
+        'raw_allowed_answers_path': './data/_allowed_answers.txt',
+        'allowed_guesses_path': './data/allowed_guesses.json',
+        'allowed_answers_path': './data/allowed_answers.json',
+        'full_guess_pool': '--full-pool' in argv,
+        'strategy': _get_option('--strategy', 'greedy'),
+    }
+    service = SolverService(solver_config, workers=int(_get_option('--workers', '1')))
+
+    try:
+        asyncio.run(service.serve(_get_option('--host', '127.0.0.1'), int(_get_option('--port', '8765'))))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
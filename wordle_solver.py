@@ -1,10 +1,17 @@
+import contextlib
+import hashlib
 import json
-import matplotlib.pyplot as plt
-from typing import TextIO
+import mmap
+import os
+import sqlite3
+import struct
+import time
+from collections import OrderedDict
+import numpy as np
+from typing import NamedTuple, TextIO
 from math import log, e
-from random import choice
+from random import choice, Random
 from sys import argv
-from wordfreq import zipf_frequency
 
 
 class ConsoleColor:
@@ -90,18 +97,81 @@ class GameLogic:
 
         return result
 
+    @staticmethod
+    def check_answer_batch(words_to_check, words_to_compare: list, block_size: int = 256) -> np.ndarray:
+        """
+        Vectorized Wordle game logic, same rules as "check_answer" but returns base-3 pattern codes.
+
+        Each pattern is encoded with its first character as the most significant digit, i.e. '20110' -> 174,
+        use "PatternMatrix.decode" to convert the codes back into patterns.
+
+        :param words_to_check: Word to check, or list of words to check.
+        :param words_to_compare: List of words to compare.
+        :param block_size: Number of words to check at once, bounds the memory used by intermediate arrays.
+        :return: Array of uint8 pattern codes with shape (len(words_to_compare),) for a single word to check,
+                 (len(words_to_check), len(words_to_compare)) for a list of words to check.
+        """
+
+        single = isinstance(words_to_check, str)
+        check_list = [words_to_check] if single else list(words_to_check)
+        compare_list = list(words_to_compare)
+        length = len(check_list[0]) if check_list else 0
+
+        to_check = np.frombuffer(''.join(check_list).encode('ascii'), dtype=np.uint8).reshape(-1, length)
+        to_compare = np.frombuffer(''.join(compare_list).encode('ascii'), dtype=np.uint8).reshape(-1, length)
+        result = np.zeros((len(check_list), len(compare_list)), dtype=np.uint8)
+
+        for start in range(0, len(check_list), block_size):
+            block = to_check[start:start + block_size, None, :]
+            same_char = block[:, :, :, None] == block[:, :, None, :]
+            green = block == to_compare[None, :, :]
+            codes = np.zeros((block.shape[0], len(compare_list)), dtype=np.uint8)
+
+            for index in range(length):
+                char = block[:, :, index:index + 1]
+                # Occurrences of this character in the word to compare that are not already matched by a green.
+                available = (to_compare[None, :, :] == char).sum(axis=2) - (green & same_char[:, :, index]).sum(axis=2)
+                # Same character used earlier without being green consumes the remaining occurrences first.
+                used = (~green[:, :, :index] & same_char[:, :, index, :index]).sum(axis=2)
+                yellow = ~green[:, :, index] & (available > used)
+                codes = codes * 3 + np.where(green[:, :, index], 2, yellow).astype(np.uint8)
+
+            result[start:start + block_size] = codes
+
+        return result[0] if single else result
+
 
 class Entropy:
     @staticmethod
-    def entropy_math(data: dict, base: float = e) -> float:
+    def entropy_math(data, base: float = e):
         """
         Calculate the entropy of the given data.
 
-        :param data: Dictionary with each result possibility as key and probability of occurrence as value.
+        :param data: Dictionary with each result possibility as key and probability of occurrence as value,
+                     or array of histograms with the occurrence count of each result along the last axis.
         :param base: Logarithmic base to use, defaults value is "e" (natural logarithm).
-        :return: Calculated entropy.
+        :return: Calculated entropy, array of entropies (one per histogram) when "data" is an array.
         """
 
+        if isinstance(data, np.ndarray):
+            if data.size == 0:
+                return np.zeros(data.shape[:-1])
+
+            totals = data.sum(axis=-1)
+
+            if np.issubdtype(data.dtype, np.integer):
+                # H = log(n) - sum(c * log(c)) / n, with c * log(c) looked up from a table.
+                table = np.arange(data.max() + 1, dtype=np.float64)
+                table[1:] *= np.log(table[1:])
+                totals = np.maximum(totals, 1)
+
+                return np.maximum(np.log(totals) - table[data].sum(axis=-1) / totals, 0) / log(base)
+
+            probabilities = data / np.where(totals > 0, totals, 1)[..., None]
+            terms = probabilities * np.log(np.where(probabilities > 0, probabilities, 1))
+
+            return terms.sum(axis=-1) / log(base) * -1
+
         result = 0
 
         for value in data.values():
@@ -109,45 +179,1494 @@ class Entropy:
 
         return result * -1
 
+    @staticmethod
+    def code_entropies(codes: np.ndarray, base: float = e) -> np.ndarray:
+        """
+        Calculate the entropy of the pattern codes of each row, faster than counting histograms for short rows.
+
+        :param codes: Array of pattern codes with shape (rows, words).
+        :param base: Logarithmic base to use, defaults value is "e" (natural logarithm).
+        :return: Array of entropies, one per row.
+        """
+
+        rows, words = codes.shape
+
+        if rows == 0 or words == 0:
+            return np.zeros(rows)
+
+        # Sorting the codes prefixed by their row index puts each row's equal codes into runs, one per pattern.
+        shift = codes.dtype.itemsize * 8
+        keys = (codes + (np.arange(rows, dtype=np.int32 if (rows << shift) < 2 ** 31 else np.int64) << shift)[:, None])
+        keys = keys.ravel()
+        keys.sort()
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        counts = np.diff(np.append(starts, keys.size))
+        # H = log(n) - sum(c * log(c)) / n, with c * log(c) looked up from a table.
+        table = np.arange(words + 1, dtype=np.float64)
+        table[1:] *= np.log(table[1:])
+        sums = np.bincount(keys[starts] >> shift, weights=table[counts], minlength=rows)
+
+        return (log(words) - sums / words) / log(base)
+
+    @staticmethod
+    def pattern_histograms(codes: np.ndarray, bins: int = 3 ** 5, block_size: int = 256) -> np.ndarray:
+        """
+        Count the occurrences of each pattern code, row by row.
+
+        :param codes: Array of pattern codes with shape (rows, words).
+        :param bins: Number of possible pattern codes.
+        :param block_size: Number of rows to count at once, small blocks keep the counters in cache.
+        :return: Array with shape (rows, bins) containing the occurrence count of each pattern code.
+        """
+
+        rows = codes.shape[0]
+        histograms = np.empty((rows, bins), dtype=np.int64)
+        offsets = (np.arange(min(rows, block_size), dtype=np.intp) * bins)[:, None]
+
+        for start in range(0, rows, block_size):
+            block = codes[start:start + block_size]
+            histograms[start:start + block_size] = np.bincount((block + offsets[:len(block)]).ravel('K'),
+                                                               minlength=len(block) * bins).reshape(-1, bins)
+
+        return histograms
+
 
 class Converter:
     @staticmethod
     def text_to_json(input_file: TextIO, output_file: TextIO) -> None:
         """
-        Convert allowed guesses in plain text into a JSON file.
+        Convert allowed guesses in plain text into a JSON file.
+        """
+
+        json.dump(Converter.text_to_dict(input_file), output_file, indent=4)
+
+    @staticmethod
+    def text_to_dict(input_file: TextIO) -> dict:
+        """
+        Convert allowed guesses in plain text into a dictionary.
+
+        :return: Dictionary with words as keys, [entropy, frequency] (zeroed) as values.
+        """
+
+        word_dictionary = {}
+
+        word = input_file.readline()
+
+        while word != '':
+            word = word[:-1]  # Remove '\n' at the end of the line.
+            word_dictionary[word] = [0] * 2
+            word = input_file.readline()
+
+        return word_dictionary
+
+
+class WordStore:
+    MAGIC = b'WRDS'
+    VERSION = 1
+    _HEADER = struct.Struct('<4sHHII')  # Magic, version, word length, word count, reserved.
+
+    def __init__(self, path: str):
+        """
+        Words with their entropy and frequency, stored in a compact binary file.
+
+        The file is a 16 bytes header, followed by every word as fixed-width ASCII bytes, then a float32 column of
+        entropies and a float32 column of frequencies (both 4 bytes aligned). It's memory-mapped when first read, so
+        columns are numpy views of the file and no per-word objects are created until asked for.
+
+        :param path: Path to the word store file.
+        """
+
+        self._path = path
+        self._buffer: mmap.mmap = None
+        self._word_bytes: np.ndarray = None
+        self._entropies: np.ndarray = None
+        self._frequencies: np.ndarray = None
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def _open(self) -> None:
+        """
+        Memory-map the file and create views of its columns.
+
+        Raises OSError when the file can't be read, ValueError when it isn't a valid word store.
+        """
+
+        if self._buffer is not None:
+            return
+
+        with open(self._path, 'rb') as reader:
+            if os.fstat(reader.fileno()).st_size < self._HEADER.size:
+                raise ValueError(f'"{self._path}" is not a word store.')
+
+            buffer = mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, word_length, count, _ = self._HEADER.unpack_from(buffer)
+        words_end = self._HEADER.size + word_length * count
+        columns_offset = -(-words_end // 4) * 4
+
+        if magic != self.MAGIC or version != self.VERSION or len(buffer) != columns_offset + 8 * count:
+            buffer.close()
+            raise ValueError(f'"{self._path}" is not a word store.')
+
+        self._buffer = buffer
+        self._word_bytes = np.frombuffer(buffer, dtype=f'S{word_length}', count=count, offset=self._HEADER.size)
+        self._entropies = np.frombuffer(buffer, dtype='<f4', count=count, offset=columns_offset)
+        self._frequencies = np.frombuffer(buffer, dtype='<f4', count=count, offset=columns_offset + 4 * count)
+
+    def close(self) -> None:
+        if self._buffer is not None:
+            self._word_bytes = self._entropies = self._frequencies = None
+
+            try:
+                self._buffer.close()
+            except BufferError:
+                pass  # Columns are still referenced elsewhere, the mapping is released along with them.
+
+            self._buffer = None
+
+    def __len__(self) -> int:
+        self._open()
+
+        return len(self._word_bytes)
+
+    @property
+    def word_bytes(self) -> np.ndarray:
+        """
+        :return: Fixed-width bytes array of the words.
+        """
+
+        self._open()
+
+        return self._word_bytes
+
+    @property
+    def words(self) -> list:
+        return self.word_bytes.astype('U').tolist()
+
+    @property
+    def entropies(self) -> np.ndarray:
+        self._open()
+
+        return self._entropies
+
+    @property
+    def frequencies(self) -> np.ndarray:
+        self._open()
+
+        return self._frequencies
+
+    def to_dict(self) -> dict:
+        """
+        Values are calculated to 2 decimals, they're rounded back after being stored as float32.
+
+        :return: Dictionary with words as keys, [entropy, frequency] as values, in the stored order.
+        """
+
+        entropies = np.round(self.entropies.astype(np.float64), 2).tolist()
+        frequencies = np.round(self.frequencies.astype(np.float64), 2).tolist()
+
+        return {word: [entropy, frequency] for word, entropy, frequency in zip(self.words, entropies, frequencies)}
+
+    def save(self, data: dict) -> None:
+        """
+        Replace the stored words.
+
+        :param data: Dictionary with words (all of the same length) as keys, [entropy, frequency] as values.
+        """
+
+        words = list(data.keys())
+        word_length = len(words[0]) if words else 5
+
+        if any(len(word) != word_length for word in words):
+            raise ValueError('Words in a word store must be of the same length.')
+        values = np.array(list(data.values()), dtype='<f4').reshape(len(words), 2)
+        words_end = self._HEADER.size + word_length * len(words)
+
+        self.close()
+
+        with open(self._path + '.tmp', 'wb') as writer:
+            writer.write(self._HEADER.pack(self.MAGIC, self.VERSION, word_length, len(words), 0))
+            writer.write(''.join(words).encode('ascii'))
+            writer.write(b'\0' * (-(-words_end // 4) * 4 - words_end))
+            writer.write(np.ascontiguousarray(values[:, 0]).tobytes())
+            writer.write(np.ascontiguousarray(values[:, 1]).tobytes())
+
+        os.replace(self._path + '.tmp', self._path)
+
+    def export_json(self, output_file: TextIO) -> None:
+        """
+        Export the stored words in the same format as "Converter.text_to_json".
+        """
+
+        json.dump(self.to_dict(), output_file, indent=4)
+
+
+class PatternMatrix:
+    PATTERN_MASKS_CAPACITY = 512  # Words to keep the pattern masks of, about 70 KB each for the bundled answers.
+
+    def __init__(self, guesses: list, answers: list, path: str = None):
+        """
+        Feedback pattern of every guess against every answer, encoded as base-3 uint8 codes.
+
+        The matrix is built once, saved to "path" and memory-mapped on every later start. A sidecar JSON file next to
+        it stores the fingerprints of both word lists, the matrix is rebuilt when they no longer match. It's stored
+        column by column, so the codes of a set of answers against every guess are read from contiguous memory.
+
+        :param guesses: List of allowed guesses (matrix rows), allowed answers are always included as well.
+        :param answers: List of allowed answers (matrix columns).
+        :param path: (optional) Path to the ".npy" file to cache the matrix in, the matrix is kept in memory when None.
+        """
+
+        self._guesses = sorted(set(guesses) | set(answers))
+        self._answers = sorted(answers)
+        self._guess_index = {word: index for index, word in enumerate(self._guesses)}
+        self._answer_index = {word: index for index, word in enumerate(self._answers)}
+        self._path = path
+        self._matrix: np.ndarray = self._load()
+
+        # Row of each answer, and a bitmask of the letters used by each word, bit 0 being 'a'.
+        self.answer_rows = np.array([self._guess_index[answer] for answer in self._answers], dtype=np.intp)
+        self.guess_letters = self._letter_masks(self._guesses)
+        self.answer_letters = self.guess_letters[self.answer_rows]
+        # Letter of each word at each position, 0 being 'a'.
+        self.guess_chars = self._chars(self._guesses)
+        self.answer_chars = self.guess_chars[self.answer_rows]
+        # Index of each guess' letter at each position into tables of 26 letters per position, the letters appearing
+        # more than once in the guess index a second set of tables after them.
+        repeated = (self.guess_chars[:, :, None] == self.guess_chars[:, None, :]).sum(axis=-1) > 1
+        positions = np.arange(self.guess_chars.shape[1])
+        self.guess_slots = (self.guess_chars + positions * 26 + repeated * (len(positions) * 26)).astype(np.intp)
+        self._pattern_masks = OrderedDict()  # Least recently used first.
+
+    @property
+    def guesses(self) -> list:
+        return self._guesses
+
+    @property
+    def answers(self) -> list:
+        return self._answers
+
+    @property
+    def guess_index(self) -> dict:
+        return self._guess_index
+
+    @staticmethod
+    def encode(pattern: str) -> int:
+        """
+        Convert result pattern into its base-3 code, first character being the most significant digit.
+
+        :param pattern: Result pattern, i.e. '20110'.
+        :return: Pattern code, in range [0, 3 ** len(pattern)).
+        """
+
+        return int(pattern, 3)
+
+    @staticmethod
+    def decode(code: int, length: int = 5) -> str:
+        """
+        Convert base-3 pattern code back into result pattern.
+
+        :param code: Pattern code.
+        :param length: Length of the pattern.
+        :return: Result pattern, i.e. '20110'.
+        """
+
+        pattern = ''
+
+        for _ in range(length):
+            pattern = str(code % 3) + pattern
+            code //= 3
+
+        return pattern
+
+    @staticmethod
+    def _chars(words: list) -> np.ndarray:
+        if not words:
+            return np.zeros((0, 5), dtype=np.uint8)
+
+        return np.frombuffer(''.join(words).encode('ascii'), dtype=np.uint8).reshape(len(words), -1) - ord('a')
+
+    @staticmethod
+    def _letter_masks(words: list) -> np.ndarray:
+        if not words:
+            return np.zeros(0, dtype=np.int64)
+
+        return np.bitwise_or.reduce(np.left_shift(1, PatternMatrix._chars(words).astype(np.int64)), axis=1)
+
+    @staticmethod
+    def _fingerprint(words: list) -> str:
+        return hashlib.sha1('\n'.join(words).encode('ascii')).hexdigest()
+
+    def _load(self) -> np.ndarray:
+        """
+        Memory-map the cached matrix, build and save it first when it's missing or outdated.
+
+        :return: Pattern matrix.
+        """
+
+        if self._path is None:
+            return np.asfortranarray(GameLogic.check_answer_batch(self._guesses, self._answers))
+
+        info_path = os.path.splitext(self._path)[0] + '.json'
+        info = {
+            'guesses': self._fingerprint(self._guesses),
+            'answers': self._fingerprint(self._answers),
+            'order': 'F',
+        }
+
+        try:
+            with open(info_path, 'r') as reader:
+                if json.load(reader) == info:
+                    return np.asarray(np.load(self._path, mmap_mode='r'))
+        except (OSError, ValueError):
+            pass
+
+        print('Building pattern matrix...')
+        np.save(self._path, np.asfortranarray(GameLogic.check_answer_batch(self._guesses, self._answers)))
+
+        with open(info_path, 'w') as writer:
+            json.dump(info, writer)
+
+        return np.asarray(np.load(self._path, mmap_mode='r'))
+
+    def guess_indices(self, words: list) -> np.ndarray:
+        """
+        :param words: List of words, all of them must be in the matrix rows.
+        :return: Row index of each word.
+        """
+
+        return np.array([self._guess_index[word] for word in words], dtype=np.intp)
+
+    def answer_indices(self, words: list) -> np.ndarray:
+        """
+        :param words: List of words, all of them must be in the matrix columns.
+        :return: Column index of each word.
+        """
+
+        return np.array([self._answer_index[word] for word in words], dtype=np.intp)
+
+    def codes(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        :param rows: Row indices of the words to check.
+        :param columns: Column indices of the words to compare.
+        :return: Array of pattern codes with shape (len(rows), len(columns)).
+        """
+
+        if len(rows) * 16 < len(self._guesses):
+            return self._matrix[np.ix_(rows, columns)]
+
+        return self._matrix.T[columns].T[rows]
+
+    def word_codes(self, word: str, columns: np.ndarray) -> np.ndarray:
+        """
+        :param word: Word to check, computed with "GameLogic.check_answer_batch" when it's not in the matrix rows.
+        :param columns: Column indices of the words to compare.
+        :return: Array of pattern codes with shape (len(columns),).
+        """
+
+        if word in self._guess_index:
+            return self._matrix[self._guess_index[word]][columns]
+
+        return GameLogic.check_answer_batch(word, [self._answers[column] for column in columns.tolist()])
+
+    def to_bitset(self, columns: np.ndarray) -> int:
+        """
+        :param columns: Column indices of a set of answers.
+        :return: Set of answers as an integer, bit "i" being set when the answer in column "i" is in the set.
+        """
+
+        bits = np.zeros(len(self._answers), dtype=bool)
+        bits[columns] = True
+
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    def from_bitset(self, bitset: int) -> np.ndarray:
+        """
+        :param bitset: Set of answers created by "to_bitset".
+        :return: Sorted column indices of the answers in the set.
+        """
+
+        data = np.frombuffer(bitset.to_bytes((len(self._answers) + 7) // 8, 'little'), dtype=np.uint8)
+
+        return np.flatnonzero(np.unpackbits(data, count=len(self._answers), bitorder='little'))
+
+    def pattern_masks(self, word: str) -> dict:
+        """
+        Get the set of answers producing each pattern when "word" is guessed. Masks of the most recently used words
+        are kept, see "PATTERN_MASKS_CAPACITY", the others are computed again when asked for.
+
+        :param word: Word to check, must be in the matrix rows.
+        :return: Dictionary with pattern codes as keys, bitset of the answers producing them as values.
+        """
+
+        masks = self._pattern_masks.get(word)
+
+        if masks is None:
+            codes = self._matrix[self._guess_index[word]]
+            masks = {int(code): self.to_bitset(np.flatnonzero(codes == code)) for code in np.unique(codes).tolist()}
+            self._pattern_masks[word] = masks
+
+            if len(self._pattern_masks) > self.PATTERN_MASKS_CAPACITY:
+                self._pattern_masks.popitem(last=False)
+        else:
+            self._pattern_masks.move_to_end(word)
+
+        return masks
+
+    def pattern_mask(self, word: str, code: int) -> int:
+        """
+        Get the set of answers producing a single pattern when "word" is guessed, without computing the others.
+
+        :param word: Word to check, must be in the matrix rows.
+        :param code: Pattern code.
+        :return: Bitset of the answers producing the pattern, taken from the masks of "word" when they're kept.
+        """
+
+        masks = self._pattern_masks.get(word)
+
+        if masks is None:
+            return self.to_bitset(np.flatnonzero(self._matrix[self._guess_index[word]] == code))
+
+        self._pattern_masks.move_to_end(word)
+
+        return masks.get(code, 0)
+
+    def pattern(self, guess: str, answer: str) -> int:
+        """
+        Get the pattern code of "guess" against "answer", falls back to "GameLogic.check_answer" for unknown words.
+
+        :param guess: Word to check.
+        :param answer: Word to compare.
+        :return: Pattern code.
+        """
+
+        if guess in self._guess_index and answer in self._answer_index:
+            return int(self._matrix[self._guess_index[guess], self._answer_index[answer]])
+
+        return self.encode(GameLogic.check_answer(guess, answer))
+
+    def patterns(self, guesses, answers: list) -> np.ndarray:
+        """
+        Get the pattern codes of "guesses" against every word in "answers".
+
+        :param guesses: Word to check, or list of words to check.
+        :param answers: List of words to compare.
+        :return: Array of pattern codes with shape (len(answers),) for a single guess,
+                 (len(guesses), len(answers)) for a list of guesses.
+        """
+
+        single = isinstance(guesses, str)
+        guess_list = [guesses] if single else guesses
+
+        if all(guess in self._guess_index for guess in guess_list) and \
+                all(answer in self._answer_index for answer in answers):
+            codes = self.codes(self.guess_indices(guess_list), self.answer_indices(answers))
+        else:
+            codes = GameLogic.check_answer_batch(guess_list, answers)
+
+        return codes[0] if single else codes
+
+
+class Lexicon:
+    def __init__(self, words: list):
+        """
+        Index of a word list, with hashed membership and bitmaps of the words having each letter at each position.
+
+        Bitmaps are sets of words as integers, bit "i" being set for the word at index "i", like the bitsets of
+        "PatternMatrix". Feedback is compiled into operations on them by "compile", so the words consistent with it are
+        selected by a few integer operations instead of checking every word.
+
+        :param words: List of words of the same length.
+        """
+
+        self._words = list(words)
+        self._index = {word: index for index, word in enumerate(self._words)}
+        self._all = (1 << len(self._words)) - 1
+
+        chars = PatternMatrix._chars(self._words)
+        counts = np.stack([(chars == letter).sum(axis=1) for letter in range(26)], axis=1)
+        # Words having each letter at each position, and words having each letter more than n times.
+        self._position_masks = [[self._to_bitmap(chars[:, position] == letter) for letter in range(26)]
+                                for position in range(chars.shape[1])]
+        self._count_masks = [[self._to_bitmap(counts[:, letter] > n) for n in range(chars.shape[1])]
+                             for letter in range(26)]
+
+    def __len__(self) -> int:
+        return len(self._words)
+
+    def __contains__(self, word: str) -> bool:
+        return word in self._index
+
+    @property
+    def words(self) -> list:
+        return self._words
+
+    @staticmethod
+    def _to_bitmap(bits: np.ndarray) -> int:
+        return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+    def to_bitset(self, words: list) -> int:
+        """
+        :param words: List of words, all of them must be in the lexicon.
+        :return: Set of the words as an integer.
+        """
+
+        bitset = 0
+
+        for word in words:
+            bitset |= 1 << self._index[word]
+
+        return bitset
+
+    def from_bitset(self, bitset: int) -> list:
+        """
+        :param bitset: Set of words created by "to_bitset" or "select".
+        :return: Words in the set, in lexicon order.
+        """
+
+        data = np.frombuffer(bitset.to_bytes((len(self._words) + 7) // 8, 'little'), dtype=np.uint8)
+
+        return [self._words[index] for index in
+                np.flatnonzero(np.unpackbits(data, count=len(self._words), bitorder='little')).tolist()]
+
+    def compile(self, feedback: list, hints_only: bool = False) -> list:
+        """
+        Compile feedback into the bitmap operations selecting the words consistent with it, see "select".
+
+        :param feedback: List of (guess, pattern) tuples, i.e. [('crane', '02100')].
+        :param hints_only: (optional) Only require the revealed hints to be used, green letters in place and found
+                           letters at least as many times, like Wordle's hard mode. Otherwise words must produce the
+                           same patterns.
+        :return: List of (bitmap, required) tuples, words have to be in every required bitmap and in none of the others.
+        """
+
+        operations = []
+
+        for guess, pattern in feedback:
+            for position, (letter, result) in enumerate(zip(guess, pattern)):
+                if result == '2' or not hints_only:
+                    operations.append((self._position_masks[position][ord(letter) - ord('a')], result == '2'))
+
+            for letter in set(guess):
+                results = [result for guess_letter, result in zip(guess, pattern) if guess_letter == letter]
+                found = len(results) - results.count('0')
+                count_masks = self._count_masks[ord(letter) - ord('a')]
+
+                if found:
+                    operations.append((count_masks[found - 1], True))
+
+                if '0' in results and not hints_only:
+                    # A gray letter means the answer has no more of it than found, and yellows go to the first copies.
+                    operations.append((count_masks[found], False))
+
+                    if '1' in results[results.index('0'):]:
+                        operations.append((0, True))
+
+        return operations
+
+    def select(self, operations: list, bitset: int = None) -> int:
+        """
+        :param operations: Operations created by "compile".
+        :param bitset: (optional) Set of words to select from, defaults to every word.
+        :return: Set of the words passing every operation.
+        """
+
+        bitset = self._all if (bitset is None) else bitset
+
+        for bitmap, required in operations:
+            bitset = (bitset & bitmap) if required else (bitset & ~bitmap)
+
+            if not bitset:
+                break
+
+        return bitset
+
+    def matches(self, word: str, operations: list) -> bool:
+        """
+        :param word: Word to check, must be in the lexicon.
+        :param operations: Operations created by "compile".
+        :return: True when the word passes every operation.
+        """
+
+        return self.select(operations, 1 << self._index[word]) != 0
+
+    def consistent_words(self, feedback: list, hints_only: bool = False) -> list:
+        """
+        :param feedback: List of (guess, pattern) tuples, see "compile".
+        :param hints_only: (optional) See "compile".
+        :return: Words consistent with the feedback, in lexicon order.
+        """
+
+        return self.from_bitset(self.select(self.compile(feedback, hints_only)))
+
+
+class CandidateState:
+    SORT_LIMIT = 128  # Candidates up to which sorting their pattern codes is faster than counting histograms.
+
+    def __init__(self, pattern_matrix: PatternMatrix, candidates: list, guesses: list = None,
+                 histograms: np.ndarray = None):
+        """
+        Surviving candidates of a game, together with each guess' pattern histogram over them.
+
+        Candidates are kept as a bitset over the pattern matrix columns, so applying feedback is a single AND with
+        the precomputed set of answers producing that pattern, and set sizes are popcounts. States are never
+        modified, "filter" returns a new state, so a state can be shared or kept for later use.
+
+        :param pattern_matrix: Pattern matrix to read feedback from, it must contain every candidate and guess.
+        :param candidates: List of words that can still be the answer, they're kept in the pattern matrix order.
+        :param guesses: (optional) Fixed pool of words to track histograms for, defaults to the candidates themselves.
+                        Words of a fixed pool that can no longer split the candidates are dropped while filtering.
+        :param histograms: (optional) Precomputed histograms with shape (len(guesses), 243), counted when first used.
+        """
+
+        self._pattern_matrix = pattern_matrix
+        self._tracks_candidates = guesses is None
+        self._columns = np.sort(pattern_matrix.answer_indices(candidates))
+        self._rows = pattern_matrix.answer_rows[self._columns] if self._tracks_candidates else \
+            np.sort(pattern_matrix.guess_indices(guesses))
+        self._bitset = pattern_matrix.to_bitset(self._columns)
+        self._histograms = histograms
+        self._entropies = None
+
+    @classmethod
+    def _from_indices(cls, pattern_matrix: PatternMatrix, bitset: int, columns: np.ndarray, rows: np.ndarray,
+                      tracks_candidates: bool, histograms: np.ndarray,
+                      entropies: np.ndarray = None) -> 'CandidateState':
+        state = cls.__new__(cls)
+        state._pattern_matrix = pattern_matrix
+        state._tracks_candidates = tracks_candidates
+        state._columns = columns
+        state._rows = rows
+        state._bitset = bitset
+        state._histograms = histograms
+        state._entropies = entropies
+
+        return state
+
+    @property
+    def bitset(self) -> int:
+        return self._bitset
+
+    @property
+    def candidates(self) -> list:
+        return [self._pattern_matrix.answers[column] for column in self._columns.tolist()]
+
+    @property
+    def guesses(self) -> list:
+        return [self._pattern_matrix.guesses[row] for row in self._rows.tolist()]
+
+    @property
+    def guess_rows(self) -> np.ndarray:
+        return self._rows
+
+    @property
+    def columns(self) -> np.ndarray:
+        return self._columns
+
+    @property
+    def histograms(self) -> np.ndarray:
+        if self._histograms is None:
+            self._histograms = self._count(self._rows, self._columns)
+
+        return self._histograms
+
+    def __len__(self) -> int:
+        return len(self._columns)
+
+    def split_sizes(self, word: str) -> dict:
+        """
+        Count how many candidates would produce each pattern when "word" is guessed.
+
+        :param word: Word to check.
+        :return: Dictionary with the codes of the patterns that have any candidates as keys, their counts as values.
+        """
+
+        if word not in self._pattern_matrix.guess_index:
+            sizes = dict(enumerate(np.bincount(self._pattern_matrix.word_codes(word, self._columns)).tolist()))
+        else:
+            sizes = {code: bin(self._bitset & mask).count('1')
+                     for code, mask in self._pattern_matrix.pattern_masks(word).items()}
+
+        return {code: size for code, size in sizes.items() if size > 0}
+
+    def _count(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        if len(rows) == 0 or len(columns) == 0:
+            return np.zeros((len(rows), 3 ** 5), dtype=np.int64)
+
+        return Entropy.pattern_histograms(self._pattern_matrix.codes(rows, columns))
+
+    def _score(self, rows: np.ndarray, columns: np.ndarray) -> np.ndarray:
+        """
+        :return: Entropy of each guess in "rows" over the candidates in "columns", in bits rounded to 2 decimals.
+        """
+
+        if len(columns) <= self.SORT_LIMIT:
+            return np.round(Entropy.code_entropies(self._pattern_matrix.codes(rows, columns), 2), 2)
+
+        return np.round(Entropy.entropy_math(self._count(rows, columns), 2), 2)
+
+    def entropies(self) -> np.ndarray:
+        """
+        Calculate the entropy of each guess over the surviving candidates.
+
+        :return: Array of entropies in bits, in the same order as "self.guesses".
+        """
+
+        if self._entropies is None:
+            self._entropies = Entropy.entropy_math(self.histograms, 2)
+
+        return self._entropies
+
+    def candidate_entropies(self, entropies: np.ndarray = None) -> np.ndarray:
+        """
+        Calculate the entropy of each surviving candidate used as a guess.
+
+        :param entropies: (optional) Precomputed result of "self.entropies()".
+        :return: Array of entropies in bits, in the same order as "self.candidates".
+        """
+
+        if self._tracks_candidates:
+            return self.entropies() if (entropies is None) else entropies
+
+        if entropies is None and self._histograms is None:
+            answer_rows = self._pattern_matrix.answer_rows[self._columns]
+
+            return Entropy.entropy_math(self._count(answer_rows, self._columns), 2)
+
+        entropies = self.entropies() if (entropies is None) else entropies
+
+        # Rows of a fixed pool stay sorted, candidates are never dropped from it.
+        return entropies[np.searchsorted(self._rows, self._pattern_matrix.answer_rows[self._columns])]
+
+    def best_guess(self, entropies: np.ndarray = None) -> tuple:
+        """
+        Pick the guess with the highest entropy (rounded to 2 decimals), preferring words that can still be the
+        answer, then the order of the guesses.
+
+        :param entropies: (optional) Precomputed result of "self.entropies()".
+        :return: Tuple of the best guess and its rounded entropy.
+        """
+
+        return self.top_guesses(1, entropies)[0]
+
+    def upper_bounds(self, rows: np.ndarray = None) -> np.ndarray:
+        """
+        Cheap upper bound of each guess' entropy.
+
+        The entropy of a pattern is at most the sum of the entropies of its positions. A position is '2' for the
+        candidates having the guessed letter there, and when the letter appears once in the guess, '1' for the other
+        candidates having it, otherwise up to one more bit is allowed for telling '1' and '0' apart. It's also at most
+        log2 of the number of patterns the guess could produce.
+
+        :param rows: (optional) Pattern matrix rows of the guesses to bound, defaults to "self.guess_rows".
+        :return: Array of upper bounds in bits, in the same order as "rows".
+        """
+
+        rows = self._rows if (rows is None) else rows
+        count = len(self._columns)
+
+        if count == 0:
+            return np.zeros(len(rows))
+
+        answer_chars = self._pattern_matrix.answer_chars[self._columns]
+        # Candidates having each letter at each position, and anywhere, by position then letter.
+        greens = np.concatenate([np.bincount(answer_chars[:, position], minlength=26)
+                                 for position in range(answer_chars.shape[1])])
+        present = np.tile(((self._pattern_matrix.answer_letters[self._columns][:, None] >> np.arange(26)) & 1)
+                          .sum(axis=0), answer_chars.shape[1])
+        # Information of an outcome seen by c candidates, looked up by c.
+        probabilities = np.arange(count + 1) / count
+        information = -probabilities * np.log2(np.maximum(probabilities, 1 / count))
+
+        entropies = np.concatenate([
+            information[greens] + information[present - greens] + information[count - present],
+            information[greens] + information[count - greens] + probabilities[count - greens] * (present > greens),
+        ])
+        options = np.tile(np.log2(1 + (present > 0) + (greens > 0)), 2)
+        slots = self._pattern_matrix.guess_slots[rows]
+
+        return np.minimum(entropies[slots].sum(axis=1), np.minimum(options[slots].sum(axis=1), log(count, 2)))
+
+    def top_guesses(self, k: int, entropies: np.ndarray = None, block_size: int = 256) -> list:
+        """
+        Pick the k best guesses, ranked the same way as "best_guess".
+
+        When the histograms haven't been counted, guesses are scored in blocks in descending order of their upper
+        bound, and scoring stops once no remaining guess can reach the k-th best entropy.
+
+        :param k: Number of guesses to pick.
+        :param entropies: (optional) Precomputed result of "self.entropies()".
+        :param block_size: (optional) Number of guesses to score at once.
+        :return: List of tuples of the guess and its rounded entropy, best first.
+        """
+
+        is_candidate = np.isin(self._rows, self._pattern_matrix.answer_rows[self._columns])
+
+        if entropies is not None or self._histograms is not None:
+            entropies = np.round(self.entropies() if (entropies is None) else entropies, 2)
+            best = np.lexsort((np.arange(len(self._rows)), ~is_candidate, -entropies))[:k].tolist()
+
+            return [(self._pattern_matrix.guesses[self._rows[index]], float(entropies[index])) for index in best]
+
+        # Rounding is monotonic, so a rounded entropy never exceeds its rounded bound, the margin covers float errors.
+        bounds = np.round(self.upper_bounds() + 1e-9, 2)
+        # Candidates win ties, so they're scored first, then the other guesses by descending bound.
+        others = np.flatnonzero(~is_candidate)
+        others = others[np.argsort(-bounds[others], kind='stable')]
+        blocks = [np.flatnonzero(is_candidate)] + [others[start:start + block_size]
+                                                   for start in range(0, len(others), block_size)]
+        scored = []
+        scores = []
+        threshold = -np.inf  # k-th best rounded entropy so far.
+        candidates_reaching = 0  # Candidates scoring at least the threshold, no other guess can beat them on a tie.
+
+        for block in blocks:
+            if len(block) == 0:
+                continue
+            elif bounds[block[0]] < threshold or (bounds[block[0]] == threshold and candidates_reaching >= k):
+                break
+
+            scored.append(block)
+            scores.append(self._score(self._rows[block], self._columns))
+            all_scores = np.concatenate(scores)
+
+            if len(all_scores) >= k:
+                threshold = np.partition(all_scores, len(all_scores) - k)[len(all_scores) - k]
+                candidates_reaching = int(np.count_nonzero(scores[0] >= threshold))
+
+        if not scored:
+            return []
+
+        scored = np.concatenate(scored)
+        scores = np.concatenate(scores)
+        best = np.lexsort((scored, ~is_candidate[scored], -scores))[:k].tolist()
+
+        return [(self._pattern_matrix.guesses[self._rows[scored[index]]], float(scores[index])) for index in best]
+
+    def anytime_guess(self, deadline: float, rows: np.ndarray = None, sample_size: int = 16,
+                      block_size: int = 256) -> tuple:
+        """
+        Pick the best guess, or the best one found by "deadline".
+
+        Guesses are first ranked by their entropy over a stratified sample of the candidates, one from each of
+        "sample_size" equal slices of them. The leading guesses are then scored exactly in blocks, until the deadline
+        passes, or no unscored guess can beat the best scored one by its upper bound.
+
+        :param deadline: Value of "time.perf_counter()" to stop scoring at.
+        :param rows: (optional) Pattern matrix rows of the guesses to pick from, ties go to the earliest one. Defaults
+                     to every guess, the candidates first, like "best_guess".
+        :param sample_size: (optional) Number of candidates to estimate the entropies with.
+        :param block_size: (optional) Number of guesses to score exactly at once.
+        :return: Tuple of the guess, its rounded entropy (estimated when not scored exactly), and whether it's surely
+                 the best guess.
+        """
+
+        if rows is None:
+            is_candidate = np.isin(self._rows, self._pattern_matrix.answer_rows[self._columns])
+            rows = np.concatenate([self._rows[is_candidate], self._rows[~is_candidate]])
+
+        count = len(self._columns)
+        positions = np.arange(len(rows))
+
+        if count <= sample_size:
+            # Sample would be every candidate, so the estimates are exact.
+            scores = self._score(rows, self._columns)
+            best = int(np.lexsort((positions, -scores))[0])
+
+            return self._pattern_matrix.guesses[rows[best]], float(scores[best]), True
+
+        sample = self._columns[(2 * np.arange(sample_size) + 1) * count // (2 * sample_size)]
+        estimates = self._score(rows, sample)
+        remaining = np.lexsort((positions, -estimates))
+        leader = remaining[0]
+        bounds = None
+        best_score, best = -np.inf, -1
+
+        while len(remaining) and time.perf_counter() < deadline:
+            block, remaining = remaining[:block_size], remaining[block_size:]
+            scores = self._score(rows[block], self._columns)
+            index = int(np.lexsort((block, -scores))[0])
+
+            if scores[index] > best_score or (scores[index] == best_score and block[index] < best):
+                best_score, best = float(scores[index]), int(block[index])
+
+            if bounds is None:
+                # Same margin as "top_guesses".
+                bounds = np.round(self.upper_bounds(rows) + 1e-9, 2)
+
+            # Only the guesses whose bound can still beat the best one are left to score.
+            remaining = remaining[(bounds[remaining] > best_score) |
+                                  ((bounds[remaining] == best_score) & (remaining < best))]
+
+        if len(remaining) == 0:
+            return self._pattern_matrix.guesses[rows[best]], best_score, True
+
+        if best < 0:
+            return self._pattern_matrix.guesses[rows[leader]], float(estimates[leader]), False
+
+        return self._pattern_matrix.guesses[rows[best]], best_score, False
+
+    def matches(self, word: str, pattern: str) -> int:
+        """
+        Find the candidates that would produce "pattern" when "word" is guessed.
+
+        :param word: Guessed word.
+        :param pattern: Result pattern of the guess.
+        :return: Bitset of the matching candidates.
+        """
+
+        if word in self._pattern_matrix.guess_index:
+            return self._bitset & self._pattern_matrix.pattern_mask(word, PatternMatrix.encode(pattern))
+
+        matches = self._pattern_matrix.word_codes(word, self._columns) == PatternMatrix.encode(pattern)
+
+        return self._pattern_matrix.to_bitset(self._columns[matches])
+
+    def subset(self, bitset: int, guesses: np.ndarray = None) -> 'CandidateState':
+        """
+        Keep only the candidates in "bitset" without updating any histograms, they're recounted when first used.
+
+        :param bitset: Bitset of the candidates to keep, i.e. from "matches".
+        :param guesses: (optional) Pattern matrix rows of the guesses to keep from a fixed pool, defaults to the ones
+                        sharing any letter with the kept candidates.
+        :return: New candidate state.
+        """
+
+        return self._subset_columns(self._pattern_matrix.from_bitset(bitset), bitset, guesses)
+
+    def _subset_columns(self, columns: np.ndarray, bitset: int, guesses: np.ndarray = None) -> 'CandidateState':
+        if self._tracks_candidates:
+            return self._from_indices(self._pattern_matrix, bitset, columns, self._pattern_matrix.answer_rows[columns],
+                                      True, None)
+
+        if guesses is None:
+            letters = np.bitwise_or.reduce(self._pattern_matrix.answer_letters[columns]) if len(columns) else 0
+            rows = self._rows[np.flatnonzero(self._pattern_matrix.guess_letters[self._rows] & letters)]
+        else:
+            rows = guesses
+
+        return self._from_indices(self._pattern_matrix, bitset, columns, rows, False, None)
+
+    def partition(self, word: str) -> dict:
+        """
+        Split the candidates by the pattern they would produce when "word" is guessed, like "subset" for each pattern.
+
+        :param word: Guessed word, it must be one of the pattern matrix guesses.
+        :return: Dictionary with the codes of the patterns that have any candidates as keys, new states of those
+                 candidates as values.
+        """
+
+        codes = self._pattern_matrix.codes(np.array([self._pattern_matrix.guess_index[word]]), self._columns)[0]
+        order = np.argsort(codes, kind='stable')
+        splits = np.flatnonzero(np.diff(codes[order])) + 1
+        states = {}
+
+        for group in np.split(order, splits):
+            columns = self._columns[group]
+            states[int(codes[group[0]])] = self._subset_columns(columns, self._pattern_matrix.to_bitset(columns))
+
+        return states
+
+    def filter(self, word: str, pattern: str) -> 'CandidateState':
+        """
+        Keep only the candidates that would produce "pattern" when "word" is guessed.
+
+        Histograms of the remaining guesses are updated by subtracting the eliminated candidates, or recounted over
+        the survivors when there are fewer survivors than eliminated candidates, whichever touches fewer patterns.
+
+        :param word: Guessed word.
+        :param pattern: Result pattern of the guess.
+        :return: New candidate state.
+        """
+
+        bitset = self.matches(word, pattern)
+        survivors = self._pattern_matrix.from_bitset(bitset)
+        eliminated = self._pattern_matrix.from_bitset(self._bitset & ~bitset)
+
+        if self._tracks_candidates:
+            kept = np.searchsorted(self._columns, survivors)
+        else:
+            # A guess sharing no letter with the survivors always results in '00000'.
+            letters = np.bitwise_or.reduce(self._pattern_matrix.answer_letters[survivors]) if len(survivors) else 0
+            kept = np.flatnonzero(self._pattern_matrix.guess_letters[self._rows] & letters)
+
+        rows = self._rows[kept]
+
+        if len(survivors) < len(eliminated):
+            histograms = self._count(rows, survivors)
+        else:
+            histograms = self.histograms[kept] - self._count(rows, eliminated)
+
+        if self._tracks_candidates:
+            return self._from_indices(self._pattern_matrix, bitset, survivors, rows, True, histograms)
+
+        # A guess with a single possible pattern can't split the survivors, nor any of their subsets.
+        entropies = Entropy.entropy_math(histograms, 2)
+        splits = (entropies > 1e-9) | np.isin(rows, self._pattern_matrix.answer_rows[survivors])
+
+        return self._from_indices(self._pattern_matrix, bitset, survivors, rows[splits], False, histograms[splits],
+                                  entropies[splits])
+
+
+class LookaheadSearch:
+    def __init__(self, depth: int = 2, breadth: int = 8, table_size: int = 100000):
+        """
+        Pick guesses minimizing the expected number of guesses left, looking "depth" guesses ahead.
+
+        Each candidate set tries its "breadth" guesses with the highest entropy. Past "depth" guesses, the number of
+        guesses a set still needs is estimated from its size. Guesses that can't beat the best one found so far by a
+        lower bound are pruned. Searched candidate sets are kept in a transposition table keyed by their bitset, so
+        sets reached again, i.e. in later games, aren't searched twice.
+
+        :param depth: (optional) Number of guesses to look ahead, including the one to pick.
+        :param breadth: (optional) Number of guesses to try for each candidate set.
+        :param table_size: (optional) Maximum number of candidate sets to keep, the oldest ones are dropped first.
+        """
+
+        self._depth = depth
+        self._breadth = breadth
+        self._table_size = table_size
+        self._table = {}  # Values are only valid for this depth and breadth, so neither can be changed.
+        self.nodes = 0  # Candidate sets searched, not found in the table.
+        self._deadline = None  # Deadline of the current search, see "best_guess".
+
+    @property
+    def depth(self) -> int:
+        return self._depth
+
+    @property
+    def breadth(self) -> int:
+        return self._breadth
+
+    @staticmethod
+    def lower_bound(count: int) -> float:
+        """
+        :return: Least expected number of guesses to find the answer among "count" candidates, a single guess can find
+                 only one of them.
+        """
+
+        return 2 - 1 / count
+
+    @staticmethod
+    def estimate(count: int) -> float:
+        """
+        :return: Expected number of guesses to find the answer among "count" candidates, exact up to 2 candidates,
+                 fitted to greedy games above that.
+        """
+
+        if count <= 2:
+            return (count + 1) / 2
+
+        return max(LookaheadSearch.lower_bound(count), 1.55 + 0.18 * log(count, 2))
+
+    def best_guess(self, state: CandidateState, deadline: float = None) -> tuple:
+        """
+        :param state: Candidates to find the answer of.
+        :param deadline: (optional) Value of "time.perf_counter()" to give up the search at. Candidate sets searched
+                         by then are kept in the table, so a later search picks up where this one stopped.
+        :return: Tuple of the best guess, and the expected number of guesses to find the answer with it. The guess is
+                 None when the deadline passed first.
+        """
+
+        self._deadline = deadline
+
+        try:
+            value, guess = self._search(state, self.depth, float('inf'))
+        except TimeoutError:
+            return None, float('inf')
+        finally:
+            self._deadline = None
+
+        return guess, value
+
+    def _search(self, state: CandidateState, depth: int, budget: float) -> tuple:
+        """
+        :param state: Candidates to find the answer of.
+        :param depth: Number of guesses left to look ahead.
+        :param budget: Expected number of guesses a guess has to beat to be picked.
+        :return: Tuple of the expected number of guesses to find the answer, and the guess to make. When no guess beats
+                 "budget" the guess is None, and the expected number is only known to be at least "budget".
+        """
+
+        count = len(state)
+
+        if count <= 2:
+            return self.estimate(count), state.candidates[0]
+        elif depth == 0:
+            return self.estimate(count), None
+
+        key = (state.bitset, depth)
+        entry = self._table.get(key)
+
+        if entry is not None and (entry[1] is not None or entry[0] >= budget):
+            return entry
+
+        if self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise TimeoutError
+
+        self.nodes += 1
+        options = []
+
+        guesses = [guess for guess, _ in state.top_guesses(self.breadth)]
+
+        if count <= self.breadth:
+            # Few enough candidates to try each of them, a candidate can find the answer a guess earlier.
+            guesses += [candidate for candidate in state.candidates if candidate not in guesses]
+
+        for guess in guesses:
+            children = state.partition(guess)
+            # Answer found by this guess needs no more guesses.
+            children.pop(PatternMatrix.encode('2' * len(guess)), None)
+            bound = 1 + sum(len(child) * self.lower_bound(len(child)) for child in children.values()) / count
+            options.append((bound, guess, children))
+
+        # Most promising first, ties keep the entropy order.
+        options.sort(key=lambda option: option[0])
+        best_value, best_guess = budget, None
+
+        for bound, guess, children in options:
+            if bound >= best_value:
+                break
+
+            value = bound
+
+            for child in sorted(children.values(), key=len, reverse=True):
+                weight = len(child) / count
+                child_bound = self.lower_bound(len(child))
+                child_value, _ = self._search(child, depth - 1, (best_value - value) / weight + child_bound)
+                value += weight * (child_value - child_bound)
+
+                if value >= best_value:
+                    break
+
+            if value < best_value:
+                best_value, best_guess = value, guess
+
+        if len(self._table) >= self._table_size:
+            del self._table[next(iter(self._table))]
+
+        self._table[key] = (best_value, best_guess)
+
+        return best_value, best_guess
+
+
+class GuessCache:
+    def __init__(self, capacity: int = 64 * 2 ** 20, path: str = None, disk_capacity: int = 512 * 2 ** 20):
+        """
+        Cache of evaluated candidate sets, keyed by a fingerprint of the set.
+
+        Recently used entries are kept in memory, and every entry is also written to an optional sqlite file, so they
+        survive across sessions. Both tiers evict their least recently used entries once over capacity. Entries are
+        sized by their JSON, as the candidate sets they're for range from a few words to thousands.
+
+        :param capacity: Bytes of entries to keep in memory.
+        :param path: (optional) Path to the sqlite file, entries are only kept in memory without it.
+        :param disk_capacity: Bytes of entries to keep in the sqlite file.
+        """
+
+        self._entries = OrderedDict()  # Key: (value, size).
+        self._size = 0
+        self._capacity = capacity
+        self._disk_capacity = disk_capacity
+        self._connection = None
+        self._writes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+        if path:
+            try:
+                self._connection = sqlite3.connect(path, timeout=30, isolation_level=None)
+                self._connection.execute('PRAGMA journal_mode=WAL')
+                self._connection.execute('PRAGMA synchronous=OFF')
+                self._connection.execute('CREATE TABLE IF NOT EXISTS guess_cache '
+                                         '(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)')
+            except sqlite3.Error:
+                print(f'{ConsoleColor.YELLOW}Failed to open guess cache "{path}", caching in memory only.'
+                      f'{ConsoleColor.NONE}')
+                self._connection = None
+
+    @staticmethod
+    def fingerprint(namespace: str, bitset: int) -> str:
+        """
+        :param namespace: Identifies everything the cached values depend on besides the candidates.
+        :param bitset: Bitset of the candidates.
+        :return: Key of the candidate set.
+        """
+
+        return hashlib.sha1(f'{namespace}:{bitset:x}'.encode('ascii')).hexdigest()
+
+    @property
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries)}
+
+    def get(self, key: str) -> dict:
+        """
+        :param key: Key from "fingerprint".
+        :return: Cached value, None when missing.
+        """
+
+        value = self._entries[key][0] if (key in self._entries) else None
+
+        if value is None and self._connection is not None:
+            try:
+                row = self._connection.execute('SELECT value FROM guess_cache WHERE key = ?', (key,)).fetchone()
+
+                if row is not None:
+                    value = json.loads(row[0])
+                    self._connection.execute('UPDATE guess_cache SET used = ? WHERE key = ?', (time.time(), key))
+                    self._remember(key, value, len(row[0]))
+            except sqlite3.Error:
+                pass
+
+        if value is None:
+            self.misses += 1
+        else:
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        return value
+
+    def put(self, key: str, value: dict) -> None:
+        """
+        :param key: Key from "fingerprint".
+        :param value: JSON serializable value.
+        """
+
+        serialized = json.dumps(value, separators=(',', ':'))
+        self._remember(key, value, len(serialized))
+
+        if self._connection is None:
+            return
+
+        try:
+            self._connection.execute('INSERT OR REPLACE INTO guess_cache VALUES (?, ?, ?)',
+                                     (key, serialized, time.time()))
+            self._writes += 1
+
+            if self._writes % 256 == 0:
+                # Most recently used entries are kept, up to the capacity.
+                self._connection.execute('DELETE FROM guess_cache WHERE key IN '
+                                         '(SELECT key FROM (SELECT key, SUM(LENGTH(value)) OVER (ORDER BY used DESC) '
+                                         'AS total FROM guess_cache) WHERE total > ?)', (self._disk_capacity,))
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key: str, value: dict, size: int) -> None:
+        if key in self._entries:
+            self._size -= self._entries[key][1]
+
+        self._entries[key] = (value, size)
+        self._entries.move_to_end(key)
+        self._size += size
+
+        while self._size > self._capacity and len(self._entries) > 1:
+            self._size -= self._entries.popitem(last=False)[1][1]
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class Instrumentation:
+    class _Phase:
+        def __init__(self, phases: dict, name: str):
+            self._phases = phases
+            self._name = name
+            self._start = 0.0
+
+        def __enter__(self):
+            self._start = time.perf_counter()
+
+        def __exit__(self, *exc_info):
+            phase = self._phases.setdefault(self._name, [0, 0.0])
+            phase[0] += 1
+            phase[1] += time.perf_counter() - self._start
+
+    class _NullPhase:
+        def __enter__(self):
+            pass
+
+        def __exit__(self, *exc_info):
+            pass
+
+    _NULL_PHASE = _NullPhase()
+
+    def __init__(self, enabled: bool = True):
+        """
+        Collect wall time and call counts of named phases, and the number of candidates left after each turn.
+
+        A disabled instance records nothing, its phases are a shared no-op, so it can always be called.
+
+        :param enabled: (optional) Whether to record anything.
+        """
+
+        self.enabled = enabled
+        self._phases = {}  # Phase name: [calls, seconds].
+        self._turns = {}  # Turn: [count, total candidates, min candidates, max candidates].
+
+    def phase(self, name: str):
+        """
+        Time a phase, i.e. "with instrumentation.phase('filter'):".
+
+        :param name: Phase name, time of phases with the same name is summed up.
+        :return: Context manager timing the phase.
+        """
+
+        if not self.enabled:
+            return Instrumentation._NULL_PHASE
+
+        return Instrumentation._Phase(self._phases, name)
+
+    def record_turn(self, turn: int, candidates: int) -> None:
+        """
+        :param turn: Turn number, starting from 1.
+        :param candidates: Number of candidates left after the turn's feedback.
+        """
+
+        if not self.enabled:
+            return
+
+        record = self._turns.get(turn)
+
+        if record is None:
+            self._turns[turn] = [1, candidates, candidates, candidates]
+        else:
+            record[0] += 1
+            record[1] += candidates
+            record[2] = min(record[2], candidates)
+            record[3] = max(record[3], candidates)
+
+    def to_dict(self) -> dict:
+        """
+        :return: JSON serializable aggregates, see "merge" to add them to another instance.
+        """
+
+        return {
+            'phases': {name: {'calls': calls, 'seconds': seconds} for name, (calls, seconds) in self._phases.items()},
+            'turns': {str(turn): {'count': count, 'total_candidates': total, 'mean_candidates': total / count,
+                                  'min_candidates': minimum, 'max_candidates': maximum}
+                      for turn, (count, total, minimum, maximum) in sorted(self._turns.items())},
+        }
+
+    def merge(self, data: dict) -> None:
         """
+        Add aggregates of another instance, i.e. from a worker process.
 
-        word_dictionary = {}
+        :param data: Result of "to_dict".
+        """
 
-        word = input_file.readline()
+        for name, phase in data['phases'].items():
+            aggregate = self._phases.setdefault(name, [0, 0.0])
+            aggregate[0] += phase['calls']
+            aggregate[1] += phase['seconds']
 
-        while word != '':
-            word = word[:-1]  # Remove '\n' at the end of the line.
-            word_dictionary[word] = [0] * 2
-            word = input_file.readline()
+        for turn, record in data['turns'].items():
+            turn = int(turn)
 
-        json.dump(word_dictionary, output_file, indent=4)
+            if turn not in self._turns:
+                self._turns[turn] = [record['count'], record['total_candidates'], record['min_candidates'],
+                                     record['max_candidates']]
+            else:
+                aggregate = self._turns[turn]
+                aggregate[0] += record['count']
+                aggregate[1] += record['total_candidates']
+                aggregate[2] = min(aggregate[2], record['min_candidates'])
+                aggregate[3] = max(aggregate[3], record['max_candidates'])
+
+    def reset(self) -> None:
+        self._phases.clear()
+        self._turns.clear()
+
+
+class SolverSnapshot(NamedTuple):
+    """
+    Game state of a solver at one point of a game, see "Solver.snapshot" and "Solver.restore".
+    """
+
+    possible_guesses: dict
+    candidate_state: CandidateState
+    next_guess: str
+    next_guess_entropy: float
+    last_used_word: str
+    used_words: tuple
+    opening_word: str
+    tree_path: str
+    pending_feedback: tuple
+    pending_ranking: str
+    next_guess_exact: bool
 
 
 class Solver:
-    def __init__(self, raw_allowed_guesses_path, raw_allowed_answers_path, allowed_guesses_path, allowed_answers_path):
+    STRATEGIES = ('greedy', 'lookahead')
+
+    def __init__(self, raw_allowed_guesses_path, raw_allowed_answers_path, allowed_guesses_path, allowed_answers_path,
+                 pattern_matrix_path: str = None, full_guess_pool: bool = False, decision_tree_path: str = None,
+                 guess_cache_path: str = None, strategy: str = 'greedy', lookahead_depth: int = 2,
+                 lookahead_breadth: int = 8):
         """
         Initialize Wordle solver.
 
         :param raw_allowed_guesses_path: Path to file storing raw allowed guesses.
         :param raw_allowed_answers_path: Path to file storing raw allowed answers.
-        :param allowed_guesses_path: Path to file storing allowed guesses.
-        :param allowed_answers_path: Path to file storing allowed answers.
+        :param allowed_guesses_path: Path to file exporting allowed guesses as JSON, they're loaded from the word
+                                     store next to it, with the same name and a ".bin" extension.
+        :param allowed_answers_path: Path to file exporting allowed answers as JSON, they're loaded from the word
+                                     store next to it, with the same name and a ".bin" extension.
+        :param pattern_matrix_path: (optional) Path to file caching the pattern matrix, defaults to
+                                    "pattern_matrix.npy" next to the allowed guesses.
+        :param full_guess_pool: (optional) Score every allowed guess instead of only the remaining answers.
+        :param decision_tree_path: (optional) Path to file storing the compiled decision tree, defaults to
+                                   "decision_tree.json" (or "decision_tree_full_pool.json") next to the allowed guesses.
+        :param guess_cache_path: (optional) Path to file storing evaluated candidate sets across sessions, defaults to
+                                 "guess_cache.sqlite" next to the allowed guesses. Pass '' to only cache in memory.
+        :param strategy: (optional) How to pick guesses after the first one, 'greedy' picks the one with the highest
+                         entropy, 'lookahead' the one needing the fewest guesses on average, see "LookaheadSearch".
+        :param lookahead_depth: (optional) Number of guesses the 'lookahead' strategy looks ahead.
+        :param lookahead_breadth: (optional) Number of guesses the 'lookahead' strategy tries for each candidate set.
         """
 
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f'Unknown strategy "{strategy}", expected one of {", ".join(self.STRATEGIES)}.')
+
         self._raw_allowed_guesses_path = raw_allowed_guesses_path
         self._raw_allowed_answers_path = raw_allowed_answers_path
         self._allowed_guesses_path = allowed_guesses_path
         self._allowed_answers_path = allowed_answers_path
+        self._pattern_matrix_path = pattern_matrix_path if (pattern_matrix_path is not None) else \
+            os.path.join(os.path.dirname(allowed_guesses_path), 'pattern_matrix.npy')
+        self._full_guess_pool = full_guess_pool
+        self._strategy = strategy
+        self._lookahead = LookaheadSearch(depth=lookahead_depth, breadth=lookahead_breadth)
+        self._decision_tree_path = decision_tree_path if (decision_tree_path is not None) else \
+            os.path.join(os.path.dirname(allowed_guesses_path),
+                         'decision_tree' + ('_full_pool' if full_guess_pool else '') +
+                         ('' if (strategy == 'greedy') else f'_{strategy}') + '.json')
+        self._guess_cache_path = guess_cache_path if (guess_cache_path is not None) else \
+            os.path.join(os.path.dirname(allowed_guesses_path), 'guess_cache.sqlite')
+        self._guess_store = WordStore(os.path.splitext(allowed_guesses_path)[0] + '.bin')
+        self._answer_store = WordStore(os.path.splitext(allowed_answers_path)[0] + '.bin')
         self._possible_guesses: dict = {}
+        self._pattern_matrix: PatternMatrix = None
         self._load_allowed_guesses(fail_limit=2)
+        self._pattern_matrix = self._load_pattern_matrix()
+        self._candidate_state = self._create_initial_state()
+        self._next_guess = ''
+        self._next_guess_entropy = 0.0
         self._last_used_word = ''
         self._used_words = []
+        self._decision_tree: dict = self._load_decision_tree()
+        self._tree_path = None if (self._decision_tree is None) else ''
+        self._pending_feedback = ()
+        # Guess cache key of the candidates, while their guesses are left to rank until the next word is needed.
+        self._pending_ranking = None
+        self._next_guess_exact = True
+        self._lexicon: Lexicon = None
+        self._guess_cache = GuessCache(path=self._guess_cache_path)
+        self._guess_cache_namespace = json.dumps(self._decision_tree_config(), sort_keys=True)
         self._pattern_replacement = {
             '2': '🟩',
             '1': '🟨',
@@ -155,28 +1674,126 @@ class Solver:
         }
 
         self.opening_word: str = ''
+        self.verbose = True
+        self.instrumentation = Instrumentation(enabled=False)
+
+        # Parsed once, "reload" and "restore" only swap references back to it.
+        self._initial_snapshot = self.snapshot()
+
+    @property
+    def config(self) -> dict:
+        """
+        :return: Keyword arguments to create an identical solver with, i.e. in another process.
+        """
+
+        return {
+            'raw_allowed_guesses_path': self._raw_allowed_guesses_path,
+            'raw_allowed_answers_path': self._raw_allowed_answers_path,
+            'allowed_guesses_path': self._allowed_guesses_path,
+            'allowed_answers_path': self._allowed_answers_path,
+            'pattern_matrix_path': self._pattern_matrix_path,
+            'full_guess_pool': self._full_guess_pool,
+            'decision_tree_path': self._decision_tree_path,
+            'guess_cache_path': self._guess_cache_path,
+            'strategy': self._strategy,
+            'lookahead_depth': self._lookahead.depth,
+            'lookahead_breadth': self._lookahead.breadth,
+        }
+
+    @property
+    def allowed_guesses(self) -> list:
+        return self._guess_store.words
+
+    @property
+    def allowed_answers(self) -> list:
+        return self._answer_store.words
+
+    @property
+    def guess_cache(self) -> GuessCache:
+        return self._guess_cache
+
+    @property
+    def pattern_matrix(self) -> PatternMatrix:
+        return self._pattern_matrix
+
+    @property
+    def lexicon(self) -> Lexicon:
+        """
+        :return: Index of the pattern matrix rows, so its bitsets and rows line up. Built when first asked for.
+        """
+
+        if self._lexicon is None:
+            self._lexicon = Lexicon(self._pattern_matrix.guesses)
+
+        return self._lexicon
+
+    @property
+    def lookahead(self) -> LookaheadSearch:
+        """
+        :return: Search picking the guesses of the 'lookahead' strategy, its depth and breadth are set when the solver
+                 is created, as the decision tree and the guess cache depend on them.
+        """
+
+        return self._lookahead
+
+    @property
+    def _picks_next_guess(self) -> bool:
+        """
+        :return: Whether the next guess is picked on its own, instead of being the first of the ranked candidates.
+        """
+
+        return self._full_guess_pool or self._strategy != 'greedy'
+
+    @property
+    def last_word_exact(self) -> bool:
+        """
+        :return: Whether the word last returned by "get_next_word" is surely the best guess, it can be an approximation
+                 when a time budget was given.
+        """
+
+        return self._next_guess_exact
+
+    @property
+    def default_opening_word(self) -> str:
+        """
+        :return: Word the solver opens with when no opening word is set, the answer with the highest opening entropy.
+        """
+
+        return next(iter(self._initial_snapshot.possible_guesses))
+
+    @property
+    def decision_tree(self) -> dict:
+        """
+        :return: Compiled decision tree nodes, None when no valid tree was loaded. See "compile_decision_tree".
+        """
+
+        return self._decision_tree
 
     def _parse_allowed_guesses(self) -> None:
         """
-        Parse raw allowed guesses to json.
+        Parse raw allowed guesses to the word store, and export it to json.
         """
 
         with open(self._raw_allowed_guesses_path, 'r') as reader:
-            with open(self._allowed_guesses_path, 'w') as writer:
-                Converter.text_to_json(input_file=reader, output_file=writer)
+            self._guess_store.save(Converter.text_to_dict(reader))
+
+        with open(self._allowed_guesses_path, 'w') as writer:
+            self._guess_store.export_json(writer)
 
     def _parse_allowed_answers(self) -> None:
         """
-        Parse raw allowed guesses to json.
+        Parse raw allowed answers to the word store, and export it to json.
         """
 
         with open(self._raw_allowed_answers_path, 'r') as reader:
-            with open(self._allowed_answers_path, 'w') as writer:
-                Converter.text_to_json(input_file=reader, output_file=writer)
+            self._answer_store.save(Converter.text_to_dict(reader))
+
+        with open(self._allowed_answers_path, 'w') as writer:
+            self._answer_store.export_json(writer)
 
     def _load_allowed_guesses(self, fail_limit) -> None:
         """
-        Load allowed guesses json file into "self._possible_guesses".
+        Load allowed answers word store into "self._possible_guesses".
 
         :param fail_limit: How many times to try before exiting the app.
         """
@@ -184,25 +1801,190 @@ class Solver:
         if fail_limit > 0:
             fail_limit -= 1
 
-            # with open(self._allowed_guesses_path, 'r') as reader:
-            with open(self._allowed_answers_path, 'r') as reader:
-                try:
-                    self._possible_guesses = dict(json.load(reader))
-                except json.decoder.JSONDecodeError:
-                    self.setup()
-                    self._load_allowed_guesses(fail_limit)
+            try:
+                self._possible_guesses = self._answer_store.to_dict()
+            except (OSError, ValueError):
+                self.setup()
+                self._load_allowed_guesses(fail_limit)
         else:
             print('Failed to load "allowed answers" for too many times. Exiting...')
             exit()
 
-    @staticmethod
-    def _calculate_entropy(word_dict: dict) -> None:
-        for word in word_dict.keys():
-            word_dict[word][0] = Solver._calculate_single_word_entropy(word, list(word_dict.keys()))
+    def _load_pattern_matrix(self) -> PatternMatrix:
+        """
+        Load the pattern matrix of allowed guesses against allowed answers.
+
+        :return: Pattern matrix.
+        """
+
+        return PatternMatrix(self._guess_store.words, self._answer_store.words, self._pattern_matrix_path)
+
+    def _create_initial_state(self) -> CandidateState:
+        """
+        Create the candidate state at the start of a game, every allowed guess is tracked in full guess pool mode.
+
+        :return: Initial candidate state.
+        """
+
+        guesses = list(self._pattern_matrix.guesses) if self._full_guess_pool else None
+
+        return CandidateState(self._pattern_matrix, list(self._possible_guesses.keys()), guesses)
+
+    def _expected_entropy(self, word: str) -> float:
+        """
+        Get the entropy "word" was expected to have over the current candidates.
+
+        :param word: Guessed word.
+        :return: Expected entropy.
+        """
+
+        if word in self._possible_guesses:
+            return self._possible_guesses[word][0]
+
+        if word == self._next_guess:
+            return self._next_guess_entropy
+
+        sizes = list(self._candidate_state.split_sizes(word).values())
+
+        return round(float(Entropy.entropy_math(np.array(sizes), 2)), 2)
+
+    def _decision_tree_config(self) -> dict:
+        """
+        :return: Everything a compiled decision tree depends on, besides the opening word.
+        """
+
+        config = {
+            'answers': hashlib.sha1('\n'.join(self._initial_candidates()).encode('ascii')).hexdigest(),
+            'guesses': hashlib.sha1('\n'.join(self._pattern_matrix.guesses).encode('ascii')).hexdigest(),
+            'full_guess_pool': self._full_guess_pool,
+            'strategy': self._strategy,
+        }
+
+        # Greedy guesses don't depend on the search, so its trees and cached guesses stay valid whatever it's set to.
+        if self._strategy == 'lookahead':
+            config['lookahead_depth'] = self._lookahead.depth
+            config['lookahead_breadth'] = self._lookahead.breadth
+
+        return config
+
+    def _initial_candidates(self) -> list:
+        """
+        :return: Possible answers at the start of a game, in the order the solver picks from them.
+        """
+
+        snapshot = getattr(self, '_initial_snapshot', None)
+
+        return list((self._possible_guesses if (snapshot is None) else snapshot.possible_guesses).keys())
+
+    def _load_decision_tree(self) -> dict:
+        """
+        Load the compiled decision tree, it's ignored when it was compiled from different word data or settings.
+
+        :return: Decision tree nodes, None when there's no valid tree.
+        """
+
+        try:
+            with open(self._decision_tree_path, 'r') as reader:
+                decision_tree = json.load(reader)
+        except (OSError, ValueError):
+            return None
+
+        if decision_tree.get('config') != self._decision_tree_config():
+            return None
+
+        return decision_tree['nodes']
+
+    def _leave_decision_tree(self) -> None:
+        """
+        Stop following the decision tree, feedback received while on it is applied to the live state first.
+        """
+
+        pending_feedback = self._pending_feedback
+        last_used_word = self._last_used_word
+        verbose = self.verbose
+
+        self._tree_path = None
+        self._pending_feedback = ()
+        self.verbose = False
+
+        with self.instrumentation.phase('decision_tree_replay'):
+            for word, pattern in pending_feedback:
+                self._last_used_word = word
+                self._evaluate(pattern)
+
+        self._last_used_word = last_used_word
+        self.verbose = verbose
+
+    def _compile_node(self, path: str, rounds_left: int, nodes: dict) -> None:
+        """
+        Record the next guess at "path", then every pattern it can produce, recursively.
+
+        :param path: Comma separated patterns received so far.
+        :param rounds_left: Number of guesses left, including this one.
+        :param nodes: Dictionary to add the nodes to.
+        """
+
+        node_snapshot = self.snapshot()
+        guess = self.get_next_word()
+        nodes[path] = [guess, self._expected_entropy(guess), len(self._candidate_state)]
+
+        if rounds_left > 1:
+            guess_snapshot = self.snapshot()
+
+            for code in sorted(self._candidate_state.split_sizes(guess).keys()):
+                pattern = PatternMatrix.decode(code)
+
+                if pattern != '2' * len(pattern):
+                    self.restore(guess_snapshot)
+                    self.evaluate(pattern)
+                    self._compile_node(pattern if (path == '') else f'{path},{pattern}', rounds_left - 1, nodes)
+
+        self.restore(node_snapshot)
+
+    def compile_decision_tree(self, round_limit: int = 6) -> dict:
+        """
+        Walk every game the solver can play from the start and save the guess it makes after each feedback path.
+
+        Later sessions look their guesses up from the saved tree, as long as their feedback stays on it.
+
+        :param round_limit: Number of rounds to compile.
+        :return: Decision tree nodes, with comma separated patterns as keys and
+                 [next guess, its expected entropy, number of candidates] as values.
+        """
+
+        verbose = self.verbose
+        opening_word = self.opening_word
+        self.verbose = False
+        self.restore(self._initial_snapshot._replace(tree_path=None, opening_word=opening_word))
+
+        nodes = {}
+        self._compile_node('', round_limit, nodes)
+
+        decision_tree = {'config': self._decision_tree_config(), 'nodes': nodes}
+
+        with open(self._decision_tree_path, 'w') as writer:
+            json.dump(decision_tree, writer, separators=(',', ':'))
+
+        self._decision_tree = nodes
+        self._initial_snapshot = self._initial_snapshot._replace(tree_path='')
+        self.restore(self._initial_snapshot._replace(opening_word=opening_word))
+        self.verbose = verbose
+
+        return nodes
+
+    def _calculate_entropy(self, word_dict: dict) -> None:
+        words = list(word_dict.keys())
+
+        if not words:
+            return
+
+        histograms = Entropy.pattern_histograms(self._pattern_matrix.patterns(words, words))
+
+        for word, entropy in zip(words, Entropy.entropy_math(histograms, 2).tolist()):
+            word_dict[word][0] = round(entropy, 2)
             # print(f"{word}: {word_dict[word]}")
 
-    @staticmethod
-    def _calculate_single_word_entropy(word: str, words: list) -> float:
+    def _calculate_single_word_entropy(self, word: str, words: list) -> float:
         """
         Calculate entropy for each word using word data passed into this function.
 
@@ -211,34 +1993,27 @@ class Solver:
         :return: Entropy of the selected word.
         """
 
-        results = {}
-
-        for d in words:
-            result = GameLogic.check_answer(word, d)
-
-            if result not in results:
-                results[result] = 1
-            else:
-                results[result] += 1
-
-        for key in results.keys():
-            results[key] /= len(words)
+        histograms = Entropy.pattern_histograms(self._pattern_matrix.patterns([word], words))
 
-        return round(Entropy.entropy_math(results, 2), 2)
+        return round(float(Entropy.entropy_math(histograms, 2)[0]), 2)
 
     @staticmethod
     def _calculate_word_frequencies(data: dict) -> None:
         """
         Calculate word frequency for each word in data.
 
+        Only needed to rebuild the word stores, which keep the frequencies for every other use, so wordfreq and its
+        data are only imported here.
+
         :param data: Dictionary with words to check as keys, list with size of 2 as values.
         """
 
+        from wordfreq import zipf_frequency
+
         for word in data.keys():
             data[word][1] = zipf_frequency(word, 'en')
 
-    @staticmethod
-    def _get_reduced_words(word: str, data: dict, matching_pattern: str) -> dict:
+    def _get_reduced_words(self, word: str, data: dict, matching_pattern: str) -> dict:
         """
         """
 
@@ -257,73 +2032,455 @@ class Solver:
         }
         """
         all_matched_words = {matching_pattern: [0.0, []]}
+        matching_code = PatternMatrix.encode(matching_pattern)
+
+        for d, code in zip(data.keys(), self._pattern_matrix.patterns(word, list(data.keys())).tolist()):
+            if code == matching_code:
+                all_matched_words[matching_pattern][0] += 1
+                all_matched_words[matching_pattern][1].append(d)
+
+        all_matched_words[matching_pattern][0] = round(log((len(data) / all_matched_words[matching_pattern][0]), 2), 2)
+
+        return all_matched_words
+
+    def setup(self) -> None:
+        self._parse_allowed_guesses()
+        self._parse_allowed_answers()
+        self._pattern_matrix = self._load_pattern_matrix()
+        self._lexicon = None
+
+        self.recalculate_opening_data()
+
+    def recalculate_opening_data(self) -> None:
+        allowed_guesses = self._answer_store.to_dict()
+
+        self._calculate_entropy(allowed_guesses)  # Calculate opening entropy.
+        self._calculate_word_frequencies(allowed_guesses)
+        allowed_guesses = dict(sorted(allowed_guesses.items(), key=lambda d: d[1], reverse=True))
+
+        self._answer_store.save(allowed_guesses)
+
+        with open(self._allowed_answers_path, 'w') as writer:
+            self._answer_store.export_json(writer)
+
+    def reload(self):
+        """
+        Reset the solver for a new game, the opening word is kept.
+        """
+
+        with self.instrumentation.phase('reload'):
+            opening_word = self.opening_word
+            self.restore(self._initial_snapshot)
+            self.opening_word = opening_word
+
+    def snapshot(self) -> SolverSnapshot:
+        """
+        Capture the current game state. Game states are never modified in place, so this doesn't copy any word data.
+
+        :return: Snapshot to pass to "restore", i.e. to try out different branches of a game from here.
+        """
+
+        return SolverSnapshot(self._possible_guesses, self._candidate_state, self._next_guess,
+                              self._next_guess_entropy, self._last_used_word, tuple(self._used_words),
+                              self.opening_word, self._tree_path, self._pending_feedback, self._pending_ranking,
+                              self._next_guess_exact)
+
+    def restore(self, snapshot: SolverSnapshot) -> None:
+        """
+        Restore a game state captured by "snapshot".
+
+        :param snapshot: Snapshot to restore.
+        """
+
+        self._possible_guesses = snapshot.possible_guesses
+        self._candidate_state = snapshot.candidate_state
+        self._next_guess = snapshot.next_guess
+        self._next_guess_entropy = snapshot.next_guess_entropy
+        self._last_used_word = snapshot.last_used_word
+        self._used_words = list(snapshot.used_words)
+        self.opening_word = snapshot.opening_word
+        self._tree_path = snapshot.tree_path
+        self._pending_feedback = snapshot.pending_feedback
+        self._pending_ranking = snapshot.pending_ranking
+        self._next_guess_exact = snapshot.next_guess_exact
+
+    def evaluate(self, pattern: str) -> None:
+        with self.instrumentation.phase('evaluate'):
+            candidates = self._evaluate(pattern)
+
+        self.instrumentation.record_turn(len(self._used_words), candidates)
+
+    def _evaluate(self, pattern: str) -> int:
+        """
+        Apply the feedback of the last used word.
+
+        :param pattern: Result pattern of the last used word.
+        :return: Number of candidates left.
+        """
+
+        if self._tree_path is not None:
+            node = self._decision_tree[self._tree_path]
+            child_path = pattern if (self._tree_path == '') else f'{self._tree_path},{pattern}'
+
+            # Stay on the compiled path, the live state is only updated when leaving it.
+            if child_path in self._decision_tree or pattern == '2' * len(pattern):
+                child_size = self._decision_tree[child_path][2] if (child_path in self._decision_tree) else 1
+
+                if self.verbose:
+                    print(PatternConverter.convert(pattern, self._pattern_replacement), end='\t')
+                    print(f'Expected entropy for "{self._last_used_word}": {node[1]}, '
+                          f'actual: {round(log(node[2] / child_size, 2), 2)}')
+
+                self._tree_path = child_path
+                self._pending_feedback += ((self._last_used_word, pattern),)
+
+                return child_size
+
+            self._leave_decision_tree()
+
+        # Ties are broken by the order of the current guesses, so they're ranked even if no word was asked for.
+        self._rank_pending()
+
+        with self.instrumentation.phase('filter'):
+            bitset = self._candidate_state.matches(self._last_used_word, pattern)
+
+        with self.instrumentation.phase('guess_cache'):
+            cache_key = GuessCache.fingerprint(self._guess_cache_namespace, bitset)
+            cached = self._guess_cache.get(cache_key)
+
+        with self.instrumentation.phase('filter'):
+            if cached is None and self._full_guess_pool:
+                # Only the best guess of the pool is needed, "top_guesses" scores as few of them as it can.
+                new_candidate_state = self._candidate_state.subset(bitset)
+            elif cached is None:
+                new_candidate_state = self._candidate_state.filter(self._last_used_word, pattern)
+            else:
+                # Pool guesses are the ones sharing a letter with the candidates, they're rebuilt from the bitset.
+                new_candidate_state = self._candidate_state.subset(bitset)
+
+        if self.verbose:
+            print(PatternConverter.convert(pattern, self._pattern_replacement), end='\t')
+            print(f'Expected entropy for '
+                  f'"{self._last_used_word}": {self._expected_entropy(self._last_used_word)}, '
+                  f'actual: {round(log(len(self._candidate_state) / len(new_candidate_state), 2), 2)}')
+
+        self._candidate_state = new_candidate_state
+        self._next_guess, self._next_guess_entropy = '', 0.0
+
+        if cached is not None:
+            if self._picks_next_guess:
+                self._next_guess, self._next_guess_entropy = cached['next_guess']
+
+            # Rebuilt from the current order, ties are broken the same way as when calculated.
+            with self.instrumentation.phase('frequency'):
+                self._possible_guesses = {key: list(cached['guesses'][key])
+                                          for key in self._possible_guesses.keys() if key in cached['guesses']}
+
+            with self.instrumentation.phase('sort'):
+                self._possible_guesses = dict(sorted(self._possible_guesses.items(), key=lambda d: d[1][0],
+                                                     reverse=True))
+
+            return len(self._candidate_state)
+
+        self._pending_ranking = cache_key
+
+        return len(self._candidate_state)
+
+    def _rank_pending(self) -> None:
+        """
+        Rank the guesses of the current candidates, if "_evaluate" left them to rank.
+        """
+
+        if self._pending_ranking is None:
+            return
+
+        cache_key = self._pending_ranking
+        self._pending_ranking = None
+
+        with self.instrumentation.phase('entropy'):
+            entropies = dict(zip(self._candidate_state.candidates,
+                                 self._candidate_state.candidate_entropies().tolist()))
+
+            if self._strategy == 'lookahead' and self._next_guess == '':
+                with self.instrumentation.phase('lookahead'):
+                    self._next_guess = self._lookahead.best_guess(self._candidate_state)[0]
+
+                sizes = list(self._candidate_state.split_sizes(self._next_guess).values())
+                self._next_guess_entropy = round(float(Entropy.entropy_math(np.array(sizes), 2)), 2)
+                self._next_guess_exact = True
+            elif self._full_guess_pool and self._next_guess == '':
+                # Pool is sorted alphabetically, so ties go to the candidates first, then alphabetical order.
+                self._next_guess, self._next_guess_entropy = self._candidate_state.best_guess()
+                self._next_guess_exact = True
+
+        with self.instrumentation.phase('frequency'):
+            new_possible_guesses = {}
+            for key in self._possible_guesses.keys():
+                if key in entropies:
+                    # Frequencies never change, they're kept from the word store.
+                    new_possible_guesses[key] = [round(entropies[key], 2), self._possible_guesses[key][1]]
+
+            self._possible_guesses = new_possible_guesses
+            del new_possible_guesses
+
+        # An approximate next guess from a time budget isn't worth remembering.
+        if self._next_guess_exact or not self._picks_next_guess:
+            with self.instrumentation.phase('guess_cache'):
+                self._guess_cache.put(cache_key, {
+                    'guesses': self._possible_guesses,
+                    'next_guess': [self._next_guess, self._next_guess_entropy],
+                })
+
+        with self.instrumentation.phase('sort'):
+            self._possible_guesses = dict(sorted(self._possible_guesses.items(), key=lambda d: d[1][0], reverse=True))
+
+    def _anytime_guess(self, deadline: float) -> tuple:
+        """
+        Pick the next guess of the unranked candidates by "deadline", see "CandidateState.anytime_guess". The
+        'lookahead' strategy searches until the deadline first, and only falls back to the entropy pick after it.
+
+        :param deadline: Value of "time.perf_counter()" to stop scoring at.
+        :return: Tuple of the guess, its rounded entropy, and whether it's surely the best guess.
+        """
+
+        rows = None
+
+        if self._strategy == 'lookahead':
+            guess = self._lookahead.best_guess(self._candidate_state, deadline)[0]
+
+            if guess is not None:
+                sizes = list(self._candidate_state.split_sizes(guess).values())
+
+                return guess, round(float(Entropy.entropy_math(np.array(sizes), 2)), 2), True
+
+        if not self._full_guess_pool:
+            # Same tie order as ranking them, the order of the current guesses.
+            candidates = set(self._candidate_state.candidates)
+            rows = self._pattern_matrix.answer_rows[self._pattern_matrix.answer_indices(
+                [key for key in self._possible_guesses.keys() if key in candidates])]
+
+        guess, entropy, exact = self._candidate_state.anytime_guess(deadline, rows)
+
+        # Even the best entropy isn't the guess the search would pick, so it's never exact for 'lookahead'.
+        return guess, entropy, exact and self._strategy == 'greedy'
+
+    def get_next_word(self, time_budget: float = None) -> str:
+        """
+        Pick the next word to guess.
+
+        :param time_budget: (optional) Seconds to pick the word in, the best word found by then is picked. See
+                            "last_word_exact" for whether it's surely the best one.
+        :return: Next word.
+        """
+
+        deadline = None if (time_budget is None) else time.perf_counter() + time_budget
+
+        with self.instrumentation.phase('get_next_word'):
+            return self._get_next_word(deadline)
+
+    def _get_next_word(self, deadline: float = None) -> str:
+        if self._tree_path is not None:
+            guess = self._decision_tree[self._tree_path][0] if (self._tree_path in self._decision_tree) else ''
+            expected_guess = self.opening_word
+
+            if self._tree_path == '' and expected_guess == '':
+                expected_guess = next(iter(self._possible_guesses))
+
+            if guess != '' and expected_guess in ('', guess):
+                self.opening_word = ''
+                self._last_used_word = guess
+                self._used_words.append(guess)
+
+                return guess
+
+            self._leave_decision_tree()
+
+        if self.opening_word == '' and self._pending_ranking is not None and deadline is not None:
+            with self.instrumentation.phase('anytime'):
+                self._next_guess, self._next_guess_entropy, self._next_guess_exact = self._anytime_guess(deadline)
+        else:
+            self._next_guess_exact = True
+            self._rank_pending()
+
+        if self.opening_word == '' and self._next_guess != '':
+            self._last_used_word = self._next_guess
+        elif self.opening_word == '':
+            self._last_used_word = next(iter(self._possible_guesses))
+        else:
+            self._last_used_word = (self.opening_word + '.')[:-1]
+            self.opening_word = ''
+
+        self._used_words.append(self._last_used_word)
+
+        return self._last_used_word
+
+
+class MultiBoardSolver:
+    def __init__(self, pattern_matrix: PatternMatrix, answers: list, boards: int = 4):
+        """
+        Solve several boards at once, like Quordle (4 boards) or Octordle (8 boards), every guess is played on each
+        unsolved board.
+
+        Each board keeps its own candidate state over the shared pattern matrix. Guesses are scored on every board in
+        one pass: their codes against the union of the boards' candidates are read once, then each board takes its
+        entropy from its own columns of them, and boards with the same candidates are only scored once. Boards are
+        independent, so a guess' combined information gain is the sum of its entropies on the unsolved boards.
+
+        :param pattern_matrix: Pattern matrix to read feedback from.
+        :param answers: List of the possible answers of each board, guesses are picked among them as well.
+        :param boards: (optional) Number of boards.
+        """
+
+        if boards < 1:
+            raise ValueError(f'A game needs at least one board, got {boards}.')
+
+        self._pattern_matrix = pattern_matrix
+        self._boards = boards
+        self._initial_state = CandidateState(pattern_matrix, answers)
+        self._first_guess = ''  # Best first guess, every game starts from the same candidates.
+        self._states = []
+        self._solved = []
+        self._last_used_word = ''
+
+        self.opening_word: str = ''
+
+        self.reload()
+
+    @property
+    def boards(self) -> int:
+        return self._boards
+
+    @property
+    def round_limit(self) -> int:
+        """
+        :return: Number of guesses a game allows, 9 for 4 boards and 13 for 8 boards, like Quordle and Octordle.
+        """
+
+        return self._boards + 5
+
+    @property
+    def solved(self) -> list:
+        """
+        :return: Whether each board has been solved.
+        """
+
+        return list(self._solved)
+
+    @property
+    def candidates(self) -> list:
+        """
+        :return: List of the remaining candidates of each board, empty for solved boards.
+        """
+
+        return [[] if solved else state.candidates for state, solved in zip(self._states, self._solved)]
+
+    def reload(self) -> None:
+        """
+        Reset the solver for a new game, the opening word is kept.
+        """
+
+        self._states = [self._initial_state] * self._boards
+        self._solved = [False] * self._boards
+        self._last_used_word = ''
+
+    def scores(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Calculate the combined entropy of each guess over the unsolved boards.
 
-        for d in data.keys():
-            if GameLogic.check_answer(word, d) == matching_pattern:
-                all_matched_words[matching_pattern][0] += 1
-                all_matched_words[matching_pattern][1].append(d)
+        :param rows: Pattern matrix rows of the guesses.
+        :return: Array of entropies in bits, in the same order as "rows".
+        """
 
-        all_matched_words[matching_pattern][0] = round(log((len(data) / all_matched_words[matching_pattern][0]), 2), 2)
+        boards = {}
 
-        return all_matched_words
+        for state, solved in zip(self._states, self._solved):
+            if not solved:
+                weight = boards[state.bitset][1] + 1 if (state.bitset in boards) else 1
+                boards[state.bitset] = (state, weight)
 
-    def setup(self) -> None:
-        self._parse_allowed_guesses()
-        self._parse_allowed_answers()
+        if not boards:
+            return np.zeros(len(rows))
 
-        self.recalculate_opening_data()
+        columns, inverse = np.unique(np.concatenate([state.columns for state, _ in boards.values()]),
+                                     return_inverse=True)
+        codes = self._pattern_matrix.codes(rows, columns)
+        scores = np.zeros(len(rows))
+        offset = 0
 
-    def recalculate_opening_data(self) -> None:
-        with open(self._allowed_answers_path, 'r') as reader:
-            allowed_guesses = dict(json.load(reader))
+        for state, weight in boards.values():
+            board_codes = codes[:, inverse[offset:offset + len(state)]]
+            offset += len(state)
 
-            with open(self._allowed_answers_path, 'w') as writer:
-                self._calculate_entropy(allowed_guesses)  # Calculate opening entropy.
-                self._calculate_word_frequencies(allowed_guesses)
-                allowed_guesses = dict(sorted(allowed_guesses.items(), key=lambda d: d[1], reverse=True))
+            if len(state) <= CandidateState.SORT_LIMIT:
+                scores += weight * Entropy.code_entropies(board_codes, 2)
+            else:
+                scores += weight * Entropy.entropy_math(Entropy.pattern_histograms(board_codes), 2)
 
-                json.dump(allowed_guesses, writer, indent=4)
+        return scores
 
-    def reload(self):
-        self._load_allowed_guesses(fail_limit=2)
-        self._last_used_word = ''
-        self._used_words = []
+    def _pick_guess(self) -> str:
+        """
+        Pick the guess with the highest combined entropy (rounded to 2 decimals) among the candidates of the unsolved
+        boards, preferring the guesses most likely to solve a board, then the pattern matrix order.
+        """
 
-    def evaluate(self, pattern: str) -> None:
-        result = self._get_reduced_words(self._last_used_word, self._possible_guesses, pattern)
-        print(PatternConverter.convert(pattern, self._pattern_replacement), end='\t')
-        print(f'Expected entropy for '
-              f'"{self._last_used_word}": {self._possible_guesses[self._last_used_word][0]}, '
-              f'actual: {result[pattern][0]}')
+        states = [state for state, solved in zip(self._states, self._solved) if not solved]
 
-        new_possible_guesses = {}
-        for key in self._possible_guesses.keys():
-            if key in result[pattern][1]:
-                new_possible_guesses[key] = [0, 0]
+        # A board with a single candidate left is solved by guessing it, it has to be guessed at some point anyway.
+        for state in states:
+            if len(state) == 1:
+                return state.candidates[0]
 
-        self._possible_guesses = new_possible_guesses
-        del new_possible_guesses
+        rows = np.unique(np.concatenate([state.guess_rows for state in states]))
+        scores = np.round(self.scores(rows), 2)
+        solve_chances = sum(np.isin(rows, state.guess_rows) / len(state) for state in states)
+        best = int(np.lexsort((rows, -solve_chances, -scores))[0])
 
-        self._calculate_entropy(self._possible_guesses)
-        self._calculate_word_frequencies(self._possible_guesses)
-        self._possible_guesses = dict(sorted(self._possible_guesses.items(), key=lambda d: d[1][0], reverse=True))
+        return self._pattern_matrix.guesses[rows[best]]
 
     def get_next_word(self) -> str:
-        if self.opening_word == '':
-            self._last_used_word = next(iter(self._possible_guesses))
+        if all(self._solved):
+            raise ValueError('Every board is solved already.')
+
+        if self._last_used_word == '' and self.opening_word:
+            word = self.opening_word
+        elif self._last_used_word == '':
+            if not self._first_guess:
+                self._first_guess = self._pick_guess()
+
+            word = self._first_guess
         else:
-            self._last_used_word = (self.opening_word + '.')[:-1]
-            self.opening_word = ''
+            word = self._pick_guess()
 
-        self._used_words.append(self._last_used_word)
+        self._last_used_word = word
 
-        return self._last_used_word
+        return word
+
+    def evaluate(self, patterns: list) -> None:
+        """
+        Apply the feedback of the last word to every unsolved board.
+
+        :param patterns: Result pattern of the last word on each board, the ones of solved boards are ignored.
+        """
+
+        if len(patterns) != self._boards:
+            raise ValueError(f'Expected {self._boards} patterns, got {len(patterns)}.')
+
+        for board, pattern in enumerate(patterns):
+            if self._solved[board]:
+                continue
+            elif pattern == '2' * len(pattern):
+                self._solved[board] = True
+            else:
+                state = self._states[board]
+                self._states[board] = state.subset(state.matches(self._last_used_word, pattern))
 
 
 class WordleGame:
     def __init__(self, answer_list: list, allowed_words_list: list, game_logic, round_limit: int = 6,
                  input_injector=None, output_receiver=None, designated_answer: str = None,
-                 output_game_result_to_receiver_enabled: bool = True, result_pattern_pretty_print: bool = True):
+                 output_game_result_to_receiver_enabled: bool = True, result_pattern_pretty_print: bool = True,
+                 instrumentation: Instrumentation = None, hard_mode: bool = False, lexicon: Lexicon = None):
         """
         Wordle game initializer.
 
@@ -336,6 +2493,9 @@ class WordleGame:
         :param designated_answer: (optional) Designated answer instead of a randomly generated one.
         :param output_game_result_to_receiver_enabled: (optional) Flag to enable outputting results to console.
         :param result_pattern_pretty_print: (optional) Whether to return result in number pattern format or not.
+        :param instrumentation: (optional) Instrumentation to time the games with.
+        :param hard_mode: (optional) Whether every guess has to use the hints revealed so far.
+        :param lexicon: (optional) Index of the allowed guesses to share, i.e. "Solver.lexicon", built when None.
         """
 
         self._answer_list = answer_list
@@ -347,14 +2507,47 @@ class WordleGame:
         self._answer = self._pick_answer() if (designated_answer is None) else designated_answer
         self._is_output_game_result_to_receiver_enabled = output_game_result_to_receiver_enabled
         self._result_pattern_pretty_print = result_pattern_pretty_print
+        self._instrumentation = Instrumentation(enabled=False) if (instrumentation is None) else instrumentation
+        self._hard_mode = hard_mode
+        self._lexicon = Lexicon(allowed_words_list) if (lexicon is None) else lexicon
         self._word_length = len(self._answer)
         self._guessed_answers = []
+        self._patterns = []
+        self._hints = []  # Operations of the revealed hints, see "Lexicon.compile".
         self._pattern_replacement = {
             '2': '🟩',
             '1': '🟨',
             '0': '⬛️',
         }
 
+    @property
+    def allowed_words_list(self) -> list:
+        return self._allowed_words_list
+
+    @property
+    def round_limit(self) -> int:
+        return self._round_limit
+
+    @property
+    def hard_mode(self) -> bool:
+        return self._hard_mode
+
+    @property
+    def lexicon(self) -> Lexicon:
+        return self._lexicon
+
+    @property
+    def guessed_answers(self) -> list:
+        return list(self._guessed_answers)
+
+    @property
+    def patterns(self) -> list:
+        """
+        :return: Result pattern of each guess of the current game, in number pattern format.
+        """
+
+        return list(self._patterns)
+
     def _pick_answer(self) -> str:
         """
         Pick a random word from self._answer_list as answer.
@@ -382,9 +2575,12 @@ class WordleGame:
             is_valid = False
             print(f'You\'ve used the word "{input_content}", use a different word instead.')
 
-        if input_content not in self._allowed_words_list:
+        if input_content not in self._lexicon:
             is_valid = False
             print(f'The word "{input_content}" does not exist or not permitted, use a different word instead.')
+        elif self._hard_mode and not self._lexicon.matches(input_content, self._hints):
+            is_valid = False
+            print(f'The word "{input_content}" doesn\'t use every revealed hint, use a different word instead.')
 
         return is_valid
 
@@ -395,16 +2591,27 @@ class WordleGame:
         :return: Number of times used to guess the correct answer.
         """
 
+        with self._instrumentation.phase('play'):
+            return self._play_rounds()
+
+    def _play_rounds(self) -> int:
         for i in range(1, self._round_limit + 1):
             guess = self._input()
 
             # Re get input if the input is invalid.
-            while not self._validate_input(guess):
-                guess = self._input()
+            with self._instrumentation.phase('validate_input'):
+                while not self._validate_input(guess):
+                    guess = self._input()
 
             self._guessed_answers.append(guess)
 
-            result = self._game_logic(guess, self._answer)
+            with self._instrumentation.phase('game_logic'):
+                result = self._game_logic(guess, self._answer)
+
+            self._patterns.append(result)
+
+            if self._hard_mode:
+                self._hints += self._lexicon.compile([(guess, result)], hints_only=True)
 
             if self._result_pattern_pretty_print:
                 self._output(PatternConverter.convert(result, self._pattern_replacement))
@@ -433,35 +2640,411 @@ class WordleGame:
         self._answer = self._pick_answer() if (designated_answer is None) else designated_answer
         self._word_length = len(self._answer)
         self._guessed_answers = []
+        self._patterns = []
+        self._hints = []
         print(f'Answer: {self._answer}')
 
         return self.play()
 
 
 class Simulator:
+    _worker: 'Simulator' = None  # Simulator of the current worker process.
+
     def __init__(self, allowed_answers: list, solver: Solver, wordle_game: WordleGame):
         self._allowed_answers = allowed_answers
         self._solver = solver
         self._wordle_game = wordle_game
+        self._opening_word = solver.opening_word
         # self._game_record = {i: [0, []] for i in range(-1, 7) if i}
         self._game_record = {i: 0 for i in range(-1, 7) if i}
 
-    def simulate(self):
-        while len(self._allowed_answers) > 0:
-            answer = self._allowed_answers.pop()
-            result = self._wordle_game.restart(answer)
-            self._game_record[result] += 1
-            # self._game_record[result][0] += 1
-            # self._game_record[result][1].append(answer)
-            self._solver.reload()
+    @staticmethod
+    def _init_worker(solver_config: dict, allowed_words_list: list, round_limit: int, hard_mode: bool,
+                     opening_word: str, instrumented: bool) -> None:
+        """
+        Create the solver and game of a worker process, the pattern matrix is memory-mapped and shared between them.
+        """
+
+        solver = Solver(**solver_config)
+        solver.opening_word = opening_word
+        solver.instrumentation = Instrumentation(enabled=instrumented)
+        wordle_game = WordleGame(allowed_words_list, allowed_words_list, GameLogic.check_answer,
+                                 round_limit=round_limit, input_injector=solver.get_next_word,
+                                 output_receiver=solver.evaluate, output_game_result_to_receiver_enabled=False,
+                                 result_pattern_pretty_print=False, instrumentation=solver.instrumentation,
+                                 hard_mode=hard_mode, lexicon=solver.lexicon)
+
+        Simulator._worker = Simulator([], solver, wordle_game)
+
+    @staticmethod
+    def _simulate_chunk(answers: list) -> tuple:
+        """
+        :return: Tuple of the record of each game, and the instrumentation aggregates of the chunk.
+        """
+
+        instrumentation = Simulator._worker._solver.instrumentation
+        records = [Simulator._worker._play_record(answer) for answer in answers]
+        aggregates = instrumentation.to_dict()
+        instrumentation.reset()
+
+        return records, aggregates
+
+    def _play(self, answer: str) -> int:
+        """
+        Play a single game against "answer" and reset the solver afterwards.
+
+        :param answer: Answer of the game.
+        :return: Number of rounds used to guess the answer, -1 when the game was lost.
+        """
+
+        self._solver.opening_word = self._opening_word
+        result = self._wordle_game.restart(answer)
+        self._solver.reload()
+
+        return result
+
+    def _play_record(self, answer: str) -> dict:
+        """
+        Play a single game against "answer", see "_play".
+
+        :param answer: Answer of the game.
+        :return: Record of the game, with its answer, guesses, patterns, turns (-1 when lost) and seconds it took.
+        """
+
+        start = time.perf_counter()
+        turns = self._play(answer)
+
+        return {
+            'answer': answer,
+            'guesses': self._wordle_game.guessed_answers,
+            'patterns': self._wordle_game.patterns,
+            'turns': turns,
+            'seconds': round(time.perf_counter() - start, 6),
+        }
+
+    def _play_parallel(self, answers: list, workers: int):
+        """
+        Play every answer across a pool of worker processes, each with its own solver.
+
+        :param answers: Answers to play.
+        :param workers: Number of worker processes.
+        :return: Generator of the record of each game, in the same order as "answers".
+        """
+
+        from multiprocessing import Pool
+
+        chunk_size = max(1, -(-len(answers) // (workers * 4)))
+        chunks = [answers[i:i + chunk_size] for i in range(0, len(answers), chunk_size)]
+        initargs = (self._solver.config, self._wordle_game.allowed_words_list, self._wordle_game.round_limit,
+                    self._wordle_game.hard_mode, self._opening_word, self._solver.instrumentation.enabled)
+
+        with Pool(workers, initializer=Simulator._init_worker, initargs=initargs) as pool:
+            for records, aggregates in pool.imap(Simulator._simulate_chunk, chunks):
+                self._solver.instrumentation.merge(aggregates)
+                yield from records
+
+    def _play_records(self, answers: list, workers: int):
+        """
+        :return: Generator of the record of each game, in the same order as "answers".
+        """
+
+        if workers > 1:
+            yield from self._play_parallel(answers, workers)
+        else:
+            for answer in answers:
+                yield self._play_record(answer)
+
+    def _add_result(self, result: int) -> None:
+        self._game_record[result] += 1
+        # self._game_record[result][0] += 1
+        # self._game_record[result][1].append(answer)
+
+        won = sum(list(self._game_record.values())[1:7])
+
+        # Losses aren't averaged, there's nothing to average until a game is won.
+        if won > 0:
+            self._game_record['Average'] = \
+                sum([key * self._game_record[key] for key in list(self._game_record.keys())[1:7]]) / won
+
+    def simulate(self, workers: int = 1):
+        """
+        Play a game against every allowed answer and record the number of rounds each game took.
+
+        :param workers: (optional) Number of worker processes to spread the games across, the recorded result is
+                        identical to the serial simulation.
+        """
+
+        answers = self._allowed_answers[::-1]
+        self._allowed_answers.clear()
+
+        with self._solver.instrumentation.phase('simulate'):
+            for record in self._play_records(answers, workers):
+                self._add_result(record['turns'])
+
+    def score_decision_tree(self):
+        """
+        Record the number of rounds each game against every allowed answer takes, like "simulate", by walking the
+        solver's compiled decision tree instead of playing the games.
+
+        Answers are split by the pattern the guess of each node produces for them, an answer getting '22222' takes as
+        many rounds as the node's depth, and answers still unsolved after the last round are lost.
+
+        Raises ValueError when the solver has no decision tree, when it was compiled for another opening word, or when
+        it's missing a node a game would reach.
+        """
+
+        nodes = self._solver.decision_tree
+        opening_word = self._opening_word or self._solver.default_opening_word
+
+        if nodes is None:
+            raise ValueError('The solver has no compiled decision tree, see "Solver.compile_decision_tree".')
+        elif nodes[''][0] != opening_word:
+            raise ValueError(f'The decision tree opens with "{nodes[""][0]}", not "{opening_word}".')
+
+        pattern_matrix = self._solver.pattern_matrix
+        round_limit = self._wordle_game.round_limit
+        solved_code = PatternMatrix.encode('2' * len(nodes[''][0]))
+        stack = [('', self._allowed_answers[::-1], 1)]
+        self._allowed_answers.clear()
+
+        while stack:
+            path, answers, rounds = stack.pop()
+
+            if path not in nodes:
+                raise ValueError(f'The decision tree has no node after "{path}", '
+                                 f'recompile it for {round_limit} rounds.')
+
+            codes = pattern_matrix.patterns(nodes[path][0], answers).tolist()
+            groups = {}
+
+            for answer, code in zip(answers, codes):
+                groups.setdefault(code, []).append(answer)
+
+            for code, group in groups.items():
+                if code == solved_code or rounds == round_limit:
+                    for _ in group:
+                        self._add_result(rounds if (code == solved_code) else -1)
+                else:
+                    pattern = PatternMatrix.decode(code, len(nodes[''][0]))
+                    stack.append((pattern if (path == '') else f'{path},{pattern}', group, rounds + 1))
+
+    def compare_strategies(self, strategies: tuple = Solver.STRATEGIES, workers: int = 1) -> list:
+        """
+        Play every answer with each strategy, on solvers with the same settings as this simulator's.
+
+        :param strategies: (optional) Names of the strategies to compare, see "Solver".
+        :param workers: (optional) Number of worker processes to spread the games of each strategy across.
+        :return: Result of each strategy, with its average turns (of the won games), failures, distribution of turns
+                 and seconds it took.
+        """
+
+        results = []
+
+        for strategy in strategies:
+            start = time.perf_counter()
+            solver = Solver(**dict(self._solver.config, strategy=strategy))
+            solver.verbose = False
+            solver.opening_word = self._opening_word
+            wordle_game = WordleGame(self._wordle_game.allowed_words_list, self._wordle_game.allowed_words_list,
+                                     GameLogic.check_answer, round_limit=self._wordle_game.round_limit,
+                                     input_injector=solver.get_next_word, output_receiver=solver.evaluate,
+                                     output_game_result_to_receiver_enabled=False, result_pattern_pretty_print=False,
+                                     hard_mode=self._wordle_game.hard_mode, lexicon=self._wordle_game.lexicon)
+            simulator = Simulator(list(self._allowed_answers), solver, wordle_game)
+
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                simulator.simulate(workers=workers)
+
+            game_record = simulator.game_record
+            results.append({
+                'strategy': strategy,
+                'average': game_record.get('Average', 0.0),
+                'failures': game_record[-1],
+                'distribution': {str(turns): count for turns, count in game_record.items() if turns != 'Average'},
+                'seconds': round(time.perf_counter() - start, 3),
+            })
+
+        return results
+
+    @staticmethod
+    def _play_boards(solver: MultiBoardSolver, answers: list) -> int:
+        """
+        Play a single multi-board game and reset the solver afterwards.
+
+        :param solver: Solver to play with.
+        :param answers: Answer of each board.
+        :return: Number of guesses used to solve every board, -1 when the game was lost.
+        """
+
+        try:
+            for turn in range(1, solver.round_limit + 1):
+                word = solver.get_next_word()
+                solver.evaluate([GameLogic.check_answer(word, answer) for answer in answers])
+
+                if all(solver.solved):
+                    return turn
+
+            return -1
+        finally:
+            solver.reload()
+
+    def benchmark_boards(self, board_counts: tuple = (4, 8), games: int = 100, seed: int = 0) -> list:
+        """
+        Play random multi-board games for each number of boards, see "MultiBoardSolver".
+
+        Boards of a game have distinct answers, drawn from this simulator's answers. Solvers share the pattern matrix
+        of this simulator's solver, and keep its opening word.
+
+        :param board_counts: (optional) Numbers of boards to play with.
+        :param games: (optional) Number of games to play for each number of boards.
+        :param seed: (optional) Seed drawing the answers, the same seed plays the same games.
+        :return: Result of each number of boards, with its games per second, average guesses (of the won games),
+                 failures and distribution of guesses.
+        """
+
+        results = []
+
+        for boards in board_counts:
+            random = Random(seed)
+            solver = MultiBoardSolver(self._solver.pattern_matrix, self._allowed_answers, boards)
+            solver.opening_word = self._opening_word
+            distribution = {}
+
+            start = time.perf_counter()
+
+            for _ in range(games):
+                turns = self._play_boards(solver, random.sample(self._allowed_answers, boards))
+                distribution[turns] = distribution.get(turns, 0) + 1
+
+            seconds = time.perf_counter() - start
+            won = {turns: count for turns, count in distribution.items() if turns > 0}
+            results.append({
+                'boards': boards,
+                'games_per_second': round(games / seconds, 3),
+                'average': sum(turns * count for turns, count in won.items()) / max(sum(won.values()), 1),
+                'failures': distribution.get(-1, 0),
+                'distribution': {str(turns): count for turns, count in sorted(distribution.items())},
+            })
 
-        self._game_record['Average'] = \
-            sum([key * self._game_record[key] for key in list(self._game_record.keys())[1:]]) / \
-            sum(list(self._game_record.values())[1:])
+        return results
+
+    @staticmethod
+    def _read_stream(path: str) -> tuple:
+        """
+        Read a simulation stream written by "simulate_stream".
+
+        :param path: Path to the stream.
+        :return: Tuple of the header (None when missing), the list of game records, and the file offset after the last
+                 complete record. A line cut off by an interrupted run is left out.
+        """
+
+        header = None
+        records = []
+        offset = 0
+
+        with open(path, 'rb') as reader:
+            for line in reader:
+                if not line.endswith(b'\n'):
+                    break
+
+                try:
+                    data = json.loads(line)
+                except ValueError:
+                    break
+
+                if header is None:
+                    header = data
+                else:
+                    records.append(data)
+
+                offset += len(line)
+
+        return header, records, offset
+
+    def simulate_stream(self, output_path: str = './simulation.jsonl', workers: int = 1):
+        """
+        Like "simulate", but append a JSON line record of each game to "output_path" as soon as it's finished.
+
+        The first line of the file describes the run. When the file already holds an interrupted run with the same
+        settings, the recorded games are counted and only the remaining answers are played.
+
+        :param output_path: (optional) Path to the stream.
+        :param workers: (optional) Number of worker processes to spread the games across.
+        """
+
+        header = {
+            'opening_word': self._opening_word,
+            'full_guess_pool': self._solver.config['full_guess_pool'],
+            'strategy': self._solver.config['strategy'],
+            'round_limit': self._wordle_game.round_limit,
+            'hard_mode': self._wordle_game.hard_mode,
+        }
+        played = set()
+        offset = 0
+
+        if os.path.exists(output_path):
+            stored_header, records, offset = self._read_stream(output_path)
+
+            if stored_header is not None and stored_header != header:
+                raise ValueError(f'"{output_path}" holds a simulation with different settings: {stored_header}')
+
+            for record in records:
+                played.add(record['answer'])
+                self._add_result(record['turns'])
+
+            print(f'Resuming simulation, {len(records)} games already played.')
+
+        answers = [answer for answer in self._allowed_answers[::-1] if answer not in played]
+        self._allowed_answers.clear()
+
+        with open(output_path, 'ab') as writer:
+            writer.truncate(offset)
+
+            if offset == 0:
+                writer.write(json.dumps(header).encode('ascii') + b'\n')
+
+            with self._solver.instrumentation.phase('simulate'):
+                for record in self._play_records(answers, workers):
+                    writer.write(json.dumps(record).encode('ascii') + b'\n')
+                    writer.flush()
+                    self._add_result(record['turns'])
+
+    def profile_game(self, answer: str, profiler=None):
+        """
+        Play a single game against "answer" under a profiler.
+
+        :param answer: Answer of the game.
+        :param profiler: (optional) Profiler with "enable" and "disable" methods, defaults to a new cProfile.Profile.
+                         Wrap other profilers, i.e. a sampling profiler's start and stop, in the same interface.
+        :return: The profiler, i.e. to print its stats with pstats.
+        """
+
+        if profiler is None:
+            import cProfile
+
+            profiler = cProfile.Profile()
+
+        profiler.enable()
+
+        try:
+            self._play(answer)
+        finally:
+            profiler.disable()
+
+        return profiler
+
+    @property
+    def game_record(self) -> dict:
+        return dict(self._game_record)
 
     def dump_result(self, output_path: str = './simulation.json'):
+        result = self._game_record
+
+        if self._solver.instrumentation.enabled:
+            result = dict(self._game_record, Instrumentation=self._solver.instrumentation.to_dict())
+
         with open(output_path, 'w') as file:
-            json.dump(self._game_record, file)
+            json.dump(result, file)
 
         print('Simulation result dumped.')
 
@@ -472,6 +3055,8 @@ class Simulator:
         print('Simulation result loaded.')
 
     def draw_chart(self):
+        import matplotlib.pyplot as plt  # Slow to import, and only needed here.
+
         # x = self._game_record.keys()
         y = [i[0] for i in self._game_record.values()]
 
@@ -487,64 +3072,297 @@ class Simulator:
         plt.show()
 
 
+class OpenerSweep:
+    DEFAULT_OPENERS = ['along', 'atone', 'audio', 'blind', 'canoe', 'carte', 'crane', 'cough', 'media', 'lance',
+                       'least', 'notes', 'roast', 'radio', 'resin', 'slice', 'slate', 'slant', 'steam', 'stone',
+                       'trace', 'tried']
+
+    _worker: tuple = None  # Solver, game and answers of the current worker process.
+
+    def __init__(self, solver: Solver, wordle_game: WordleGame, allowed_answers: list,
+                 output_directory: str = './simulations'):
+        """
+        Simulate every allowed answer for each of a list of opening words, and rank the openers.
+
+        Every opener is played by the same solver (one per worker process), so the pattern matrix and the guess
+        cache are shared between them. Each opener's result is appended to "sweep.jsonl" as soon as it's finished,
+        and "leaderboard.json" is rewritten with the ranking so far.
+
+        :param solver: Solver to play the games with.
+        :param wordle_game: Game using the solver as its input and output.
+        :param allowed_answers: Answers to play for each opener.
+        :param output_directory: (optional) Directory to write the results to.
+        """
+
+        self._solver = solver
+        self._wordle_game = wordle_game
+        self._allowed_answers = allowed_answers
+        self._results_path = os.path.join(output_directory, 'sweep.jsonl')
+        self._leaderboard_path = os.path.join(output_directory, 'leaderboard.json')
+
+    @staticmethod
+    def _init_worker(solver_config: dict, allowed_words_list: list, round_limit: int, allowed_answers: list) -> None:
+        solver = Solver(**solver_config)
+        wordle_game = WordleGame(allowed_words_list, allowed_words_list, GameLogic.check_answer,
+                                 round_limit=round_limit, input_injector=solver.get_next_word,
+                                 output_receiver=solver.evaluate, output_game_result_to_receiver_enabled=False,
+                                 result_pattern_pretty_print=False, lexicon=solver.lexicon)
+
+        OpenerSweep._worker = (solver, wordle_game, allowed_answers)
+
+    @staticmethod
+    def _simulate_worker_opener(opener: str) -> dict:
+        return OpenerSweep._simulate_opener(*OpenerSweep._worker, opener)
+
+    @staticmethod
+    def _simulate_opener(solver: Solver, wordle_game: WordleGame, allowed_answers: list, opener: str) -> dict:
+        """
+        :return: Result of the opener, with its average turns (of the won games), failures and distribution of turns.
+        """
+
+        start = time.perf_counter()
+        verbose = solver.verbose
+        solver.verbose = False
+        solver.opening_word = opener
+        simulator = Simulator(list(allowed_answers), solver, wordle_game)
+
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            simulator.simulate()
+
+        solver.opening_word = ''
+        solver.verbose = verbose
+        game_record = simulator.game_record
+
+        return {
+            'opener': opener,
+            'average': game_record.get('Average', 0.0),
+            'failures': game_record[-1],
+            'distribution': {str(turns): count for turns, count in game_record.items() if turns != 'Average'},
+            'seconds': round(time.perf_counter() - start, 3),
+        }
+
+    @staticmethod
+    def rank(results: list) -> list:
+        """
+        :param results: Results of the openers.
+        :return: Results ordered by average turns, then failures, then opener, each with its rank.
+        """
+
+        ranked = sorted(results, key=lambda result: (result['average'], result['failures'], result['opener']))
+
+        return [dict(result, rank=rank) for rank, result in enumerate(ranked, 1)]
+
+    def _write_leaderboard(self, results: list) -> None:
+        with open(self._leaderboard_path + '.tmp', 'w') as writer:
+            json.dump(self.rank(results), writer, indent=4)
+
+        os.replace(self._leaderboard_path + '.tmp', self._leaderboard_path)
+
+    def sweep(self, openers: list, workers: int = 1) -> list:
+        """
+        Simulate each opener, the ones already in the results of an interrupted sweep with the same settings are kept
+        instead of played again.
+
+        :param openers: Opening words to simulate, words that aren't allowed guesses are skipped.
+        :param workers: (optional) Number of worker processes to simulate openers concurrently in.
+        :return: Ranked results, see "rank".
+        """
+
+        header = {
+            'full_guess_pool': self._solver.config['full_guess_pool'],
+            'strategy': self._solver.config['strategy'],
+            'round_limit': self._wordle_game.round_limit,
+            'answers': len(self._allowed_answers),
+        }
+        results = []
+        offset = 0
+
+        os.makedirs(os.path.dirname(self._results_path) or '.', exist_ok=True)
+
+        if os.path.exists(self._results_path):
+            stored_header, results, offset = Simulator._read_stream(self._results_path)
+
+            if stored_header is not None and stored_header != header:
+                raise ValueError(f'"{self._results_path}" holds a sweep with different settings: {stored_header}')
+
+            print(f'Resuming sweep, {len(results)} openers already simulated.')
+
+        swept = {result['opener'] for result in results}
+        remaining = []
+
+        for opener in dict.fromkeys(openers):
+            if opener not in self._wordle_game.lexicon:
+                print(f'{ConsoleColor.YELLOW}Skipping "{opener}", it isn\'t an allowed guess.{ConsoleColor.NONE}')
+            elif opener not in swept:
+                remaining.append(opener)
+
+        with open(self._results_path, 'ab') as writer:
+            writer.truncate(offset)
+
+            if offset == 0:
+                writer.write(json.dumps(header).encode('ascii') + b'\n')
+
+            for result in self._simulate_openers(remaining, workers):
+                writer.write(json.dumps(result).encode('ascii') + b'\n')
+                writer.flush()
+                results.append(result)
+                self._write_leaderboard(results)
+                print(f'{result["opener"]}: average {result["average"]:.4f}, {result["failures"]} failures')
+
+        self._write_leaderboard(results)
+
+        return self.rank(results)
+
+    def _simulate_openers(self, openers: list, workers: int):
+        """
+        :return: Generator of the result of each opener, in the order they finish.
+        """
+
+        if workers > 1 and len(openers) > 1:
+            from multiprocessing import Pool
+
+            initargs = (self._solver.config, self._wordle_game.allowed_words_list, self._wordle_game.round_limit,
+                        self._allowed_answers)
+
+            with Pool(min(workers, len(openers)), initializer=OpenerSweep._init_worker, initargs=initargs) as pool:
+                yield from pool.imap_unordered(OpenerSweep._simulate_worker_opener, openers)
+        else:
+            for opener in openers:
+                yield self._simulate_opener(self._solver, self._wordle_game, self._allowed_answers, opener)
+
+
+def _get_option(name: str, default: str = None) -> str:
+    """
+    Get the value following "name" in the command line arguments.
+
+    :param name: Option name, i.e. '--workers'.
+    :param default: Value to return when the option is missing.
+    :return: Option value.
+    """
+
+    if name in argv[:-1] and not argv[argv.index(name) + 1].startswith('--'):
+        return argv[argv.index(name) + 1]
+
+    return default
+
+
 def main():
-    solver = Solver(raw_allowed_guesses_path='./data/_allowed_guesses.txt',
-                    raw_allowed_answers_path='./data/_allowed_answers.txt',
-                    allowed_guesses_path='./data/allowed_guesses.json',
-                    allowed_answers_path='./data/allowed_answers.json')
+    if len(argv) > 1 and not argv[1].startswith('--'):
+        solver = Solver(raw_allowed_guesses_path='./data/_allowed_guesses.txt',
+                        raw_allowed_answers_path='./data/_allowed_answers.txt',
+                        allowed_guesses_path='./data/allowed_guesses.json',
+                        allowed_answers_path='./data/allowed_answers.json',
+                        full_guess_pool='--full-pool' in argv,
+                        strategy=_get_option('--strategy', 'greedy'))
 
-    if len(argv) > 1:
         if argv[1] == 'setup':
             solver.setup()
 
         elif argv[1] == 'refresh':
             solver.recalculate_opening_data()
 
+        elif argv[1] == 'compile':
+            solver.opening_word = _get_option('--opener', '')
+            nodes = solver.compile_decision_tree()
+            print(f'Compiled {len(nodes)} decision tree nodes.')
+
         elif argv[1] == 'sim':
-            with open('./data/allowed_answers.json', 'r') as allowed_answers_file:
-                allowed_answers = dict(json.load(allowed_answers_file))
-
-                with open('./data/allowed_guesses.json', 'r') as allowed_guesses_file:
-                    allowed_guesses = dict(json.load(allowed_guesses_file))
-
-                    wordle_game = WordleGame(list(allowed_answers.keys()), list(allowed_guesses.keys()),
-                                             GameLogic.check_answer, input_injector=solver.get_next_word,
-                                             output_receiver=solver.evaluate,
-                                             output_game_result_to_receiver_enabled=False,
-                                             result_pattern_pretty_print=False)
-
-                    simulator = Simulator(list(allowed_answers.keys()), solver, wordle_game)
-                    simulator.simulate()
-                    simulator.dump_result()
-
-                    # Simulate and evaluate list of different openers.
-                    # words_to_sim = ['along', 'atone', 'audio', 'blind', 'canoe', 'carte', 'crane', 'cough', 'media',
-                    #                 'lance', 'least', 'notes', 'roast', 'radio', 'resin', 'slice', 'slate', 'slant',
-                    #                 'steam', 'stone', 'trace', 'tried']
-                    #
-                    # while words_to_sim:
-                    #     word_to_sim = words_to_sim.pop()
-                    #
-                    #     solver.opening_word = word_to_sim
-                    #     simulator = Simulator(list(allowed_answers.keys()), solver, wordle_game)
-                    #     simulator.simulate()
-                    #     simulator.dump_result(f'./simulations/{word_to_sim}.json')
+            allowed_answers = solver.allowed_answers
+
+            solver.opening_word = _get_option('--opener', '')
+            solver.instrumentation.enabled = '--instrument' in argv
+
+            if '--hard' in argv and '--full-pool' in argv:
+                # Guesses from the full pool can drop revealed hints, the remaining answers always use them.
+                print('Hard mode can\'t be simulated with --full-pool.')
+                exit(1)
+
+            wordle_game = WordleGame(allowed_answers, solver.allowed_guesses,
+                                     GameLogic.check_answer, input_injector=solver.get_next_word,
+                                     output_receiver=solver.evaluate,
+                                     output_game_result_to_receiver_enabled=False,
+                                     result_pattern_pretty_print=False,
+                                     instrumentation=solver.instrumentation,
+                                     hard_mode='--hard' in argv, lexicon=solver.lexicon)
+
+            simulator = Simulator(list(allowed_answers), solver, wordle_game)
+
+            if '--profile' in argv:
+                import pstats
+
+                profiler = simulator.profile_game(_get_option('--profile'))
+                pstats.Stats(profiler).sort_stats('cumulative').print_stats(20)
+
+                return
+
+            workers = int(_get_option('--workers', '1'))
+
+            if '--boards' in argv:
+                board_counts = tuple(int(boards) for boards in _get_option('--boards', '4,8').split(','))
+
+                for result in simulator.benchmark_boards(board_counts, games=int(_get_option('--games', '100'))):
+                    print(f'{result["boards"]} boards: {result["games_per_second"]:.1f} games/s, '
+                          f'average {result["average"]:.4f} guesses, {result["failures"]} failures')
+
+                return
+
+            if '--from-tree' in argv:
+                simulator.score_decision_tree()
+                simulator.dump_result()
+
+                return
+
+            if '--compare' in argv:
+                for result in simulator.compare_strategies(workers=workers):
+                    print(f'{result["strategy"]:<10} average {result["average"]:.4f} turns, '
+                          f'{result["failures"]} failures, {result["seconds"]:.1f} s')
+
+                return
+
+            if '--stream' in argv:
+                simulator.simulate_stream(_get_option('--stream', './simulation.jsonl'), workers=workers)
+            else:
+                simulator.simulate(workers=workers)
+
+            simulator.dump_result()
+
+            if workers == 1:
+                print(f'Guess cache: {solver.guess_cache.hits} hits, {solver.guess_cache.misses} misses')
+
+        elif argv[1] == 'sweep':
+            allowed_answers = solver.allowed_answers
+
+            if '--top' in argv:
+                # Answers are stored by their opening entropy.
+                openers = allowed_answers[:int(_get_option('--top'))]
+            elif '--openers' in argv:
+                openers = _get_option('--openers').split(',')
+            else:
+                openers = OpenerSweep.DEFAULT_OPENERS
+
+            wordle_game = WordleGame(allowed_answers, solver.allowed_guesses,
+                                     GameLogic.check_answer, input_injector=solver.get_next_word,
+                                     output_receiver=solver.evaluate,
+                                     output_game_result_to_receiver_enabled=False,
+                                     result_pattern_pretty_print=False, lexicon=solver.lexicon)
+
+            opener_sweep = OpenerSweep(solver, wordle_game, allowed_answers)
+            opener_sweep.sweep(openers, workers=int(_get_option('--workers', '1')))
 
         elif argv[1] == 'assist':
+            time_budget = _get_option('--budget')
+
             for i in range(6):
-                print(solver.get_next_word())
+                word = solver.get_next_word(None if (time_budget is None) else float(time_budget))
+                print(word if solver.last_word_exact else f'{word} (approximate)')
                 solver.evaluate(input())
     else:
-        with open('./data/allowed_answers.json', 'r') as allowed_answers_file:
-            allowed_answers = dict(json.load(allowed_answers_file))
-
-            with open('./data/allowed_guesses.json', 'r') as allowed_guesses_file:
-                allowed_guesses = dict(json.load(allowed_guesses_file))
-
-                wordle_game = WordleGame(list(allowed_answers.keys()), list(allowed_guesses.keys()),
-                                         GameLogic.check_answer)
+        # Plain game doesn't need the solver, only its word lists.
+        wordle_game = WordleGame(WordStore('./data/allowed_answers.bin').words,
+                                 WordStore('./data/allowed_guesses.bin').words, GameLogic.check_answer,
+                                 hard_mode='--hard' in argv)
 
-                wordle_game.play()
+        wordle_game.play()
 
 
 if __name__ == '__main__':